@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from utils.data_processing import load_data, get_wine_statistics
 from visualizations.basic_viz import plot_wine_distribution, plot_quality_distribution
+from utils.prefetch import start_prefetcher
 
 # Set page configuration
 st.set_page_config(
@@ -10,6 +11,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Keep the external source pages cached in the background
+start_prefetcher()
+
 # Application title
 st.title("Wine Quality Analysis")
 st.write("Explore factors affecting wine quality through data visualization and analysis.")
@@ -56,6 +60,9 @@ Use the sidebar to navigate between different pages:
 4. **Feature Relationships** - Explore relationships between different features
 5. **3D Visualization** - View complex relationships in 3D visualizations
 6. **Wine Quality Factors** - Learn about non-numeric factors affecting wine quality
+7. **Similar Wines** - Find the wines with the most similar chemical profile
+8. **Quality Prediction** - Predict wine quality and explore what-if scenarios
+9. **Wine Map** - Explore a 2D t-SNE map of the chemical profiles
 """)
 
 # Information about wine quality
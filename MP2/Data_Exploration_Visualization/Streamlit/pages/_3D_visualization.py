@@ -2,7 +2,12 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from utils.data_processing import load_data, filter_data
-from visualizations.advanced_viz import create_3d_scatter, create_3d_surface, create_3d_surface_with_points, create_pca_visualization
+from visualizations.advanced_viz import create_3d_scatter, create_3d_voxel_scatter, create_3d_surface, create_3d_surface_with_points, create_pca_visualization
+from visualizations.advanced_viz import create_scree_plot, get_component_loadings
+from visualizations.plotly_output import show_cached_figure
+from utils.surface_interpolation import SURFACE_METHODS
+from utils.pca_service import get_pca_decomposition
+from utils.clustering import run_model_selection, get_model_selection_table, best_k, add_cluster_column
 
 # Set page configuration
 st.set_page_config(
@@ -53,6 +58,36 @@ viz_type = st.radio(
     horizontal=True
 )
 
+def cluster_color_controls(df, key):
+    """
+    Let the user color points by wine type or by cluster; returns (df, color column, k)
+    """
+    color_choice = st.radio("Color points by:", ["Wine type", "Cluster"], horizontal=True, key=f"{key}_color")
+    if color_choice == "Wine type":
+        return df, 'wine_type', None
+    
+    with st.spinner("Fitting clustering models..."):
+        cluster_models = run_model_selection(df)
+    
+    k_options = list(cluster_models)
+    n_clusters = st.selectbox(
+        "Number of clusters:",
+        options=k_options,
+        index=k_options.index(best_k(cluster_models)),
+        key=f"{key}_k"
+    )
+    
+    with st.expander("Clustering model selection (elbow and silhouette)"):
+        selection_table = get_model_selection_table(cluster_models)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.line_chart(selection_table['Inertia'])
+        with col2:
+            st.line_chart(selection_table['Silhouette'])
+        st.dataframe(selection_table, use_container_width=True)
+    
+    return add_cluster_column(df, n_clusters), 'cluster', n_clusters
+
 # Get numeric columns
 numeric_cols = filtered_df.select_dtypes(include=[np.number]).columns.tolist()
 if 'quality' in numeric_cols:
@@ -92,9 +127,30 @@ if viz_type == "3D Scatter Plot":
             key="z_feature_3d"
         )
     
-    # Create 3D scatter plot
-    fig = create_3d_scatter(filtered_df, x_feature_3d, y_feature_3d, z_feature_3d)
-    st.plotly_chart(fig, use_container_width=True)
+    # Aggregation keeps large filters responsive in the browser
+    aggregate_points = st.checkbox("Aggregate dense regions into voxels", value=len(filtered_df) > 5000)
+    
+    if not aggregate_points:
+        scatter_df, scatter_color, scatter_k = cluster_color_controls(filtered_df, "scatter")
+    
+    if aggregate_points:
+        col1, col2 = st.columns(2)
+        with col1:
+            point_budget = st.slider("Maximum number of markers:", 500, 20000, 5000, step=500)
+        with col2:
+            voxel_color = st.radio("Color voxels by:", ["count", "quality"], horizontal=True)
+        
+        show_cached_figure(
+            ('3d_voxel_scatter', x_feature_3d, y_feature_3d, z_feature_3d, point_budget, voxel_color),
+            create_3d_voxel_scatter, filtered_df, x_feature_3d, y_feature_3d, z_feature_3d,
+            point_budget=point_budget, color_by=voxel_color
+        )
+    else:
+        # Create 3D scatter plot (built once per data and axes)
+        show_cached_figure(
+            ('3d_scatter', x_feature_3d, y_feature_3d, z_feature_3d, scatter_color, scatter_k),
+            create_3d_scatter, scatter_df, x_feature_3d, y_feature_3d, z_feature_3d, color=scatter_color
+        )
     
     # Feature correlations
     st.subheader("Pairwise Correlations")
@@ -148,18 +204,32 @@ elif viz_type == "3D Surface Plot":
         horizontal=True
     )
     
+    # Choose the surface estimator and grid resolution
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        surface_method = st.selectbox(
+            "Surface estimator:",
+            options=list(SURFACE_METHODS),
+            format_func=SURFACE_METHODS.get,
+            help="Binned and local estimators are more robust on noisy targets such as quality"
+        )
+    
+    with col2:
+        surface_resolution = st.slider("Grid resolution:", min_value=10, max_value=100, value=20, step=5)
+    
     # Choose whether to show points
     show_points = st.checkbox("Show data points on surface", value=True)
     
     # Create 3D surface plot
+    surface_key = (x_surf, y_surf, z_surf, wine_type_surf, surface_method, surface_resolution)
+    surface_args = (filtered_df, x_surf, y_surf, z_surf, wine_type_surf, surface_method, surface_resolution)
     if show_points:
-        fig = create_3d_surface_with_points(filtered_df, x_surf, y_surf, z_surf, wine_type_surf)
+        shown = show_cached_figure(('3d_surface_points',) + surface_key, create_3d_surface_with_points, *surface_args)
     else:
-        fig = create_3d_surface(filtered_df, x_surf, y_surf, z_surf, wine_type_surf)
+        shown = show_cached_figure(('3d_surface',) + surface_key, create_3d_surface, *surface_args)
     
-    if fig:
-        st.plotly_chart(fig, use_container_width=True)
-        
+    if shown:
         # Interpretation
         st.subheader("Interpretation")
         st.write(f"""
@@ -177,28 +247,55 @@ else:  # PCA Visualization
     
     st.write("""
     PCA reduces the dimensionality of the data while preserving as much variance as possible.
-    This visualization shows the data projected onto the first three principal components.
+    This visualization shows the data projected onto three principal components of your choice.
     """)
     
+    # One decomposition per filter serves the scree plot, loadings and every projection
+    decomposition = get_pca_decomposition(filtered_df)
+    component_labels = [f'PC{i+1}' for i in range(len(decomposition.components))]
+    
+    # Scree plot and cumulative variance
+    st.subheader("Component Explorer")
+    st.plotly_chart(create_scree_plot(decomposition), use_container_width=True)
+    
+    # Choose which components to display; each axis only offers components not already on another
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        pc_x = st.selectbox("X-axis component:", options=range(len(component_labels)), index=0,
+                            format_func=component_labels.__getitem__, key="pc_x")
+    
+    with col2:
+        y_options = [i for i in range(len(component_labels)) if i != pc_x]
+        pc_y = st.selectbox("Y-axis component:", options=y_options, index=0,
+                            format_func=component_labels.__getitem__, key="pc_y")
+    
+    with col3:
+        z_options = [i for i in y_options if i != pc_y]
+        pc_z = st.selectbox("Z-axis component:", options=z_options, index=0,
+                            format_func=component_labels.__getitem__, key="pc_z")
+    
+    pc_axes = (pc_x, pc_y, pc_z)
+    
+    pca_df, pca_color, _ = cluster_color_controls(filtered_df, "pca")
+    
     # Create PCA visualization
-    fig, total_var, components, feature_names = create_pca_visualization(filtered_df)
+    fig, total_var, components, feature_names = create_pca_visualization(pca_df, axes=pc_axes, color=pca_color)
     
     if fig:
         st.plotly_chart(fig, use_container_width=True)
         
         # Display explained variance
         st.subheader("Explained Variance")
-        st.write(f"Total explained variance by the first 3 components: {total_var:.2%}")
+        st.write(f"Total explained variance by the displayed components: {total_var:.2%}")
         
         # Show PCA components
         st.subheader("Principal Components")
         st.write("The values show how much each original feature contributes to each principal component.")
         
-        component_df = pd.DataFrame(
-            components,
-            columns=feature_names,
-            index=[f'PC{i+1}' for i in range(len(components))]
-        )
+        n_loadings = st.slider("Number of components to show:", min_value=1,
+                               max_value=len(component_labels), value=max(pc_axes) + 1)
+        component_df = get_component_loadings(decomposition, n_loadings)
         
         st.dataframe(component_df, use_container_width=True)
         
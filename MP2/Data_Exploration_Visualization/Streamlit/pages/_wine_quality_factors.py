@@ -1,10 +1,14 @@
 # wine_quality_factors.py
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
-import re
 import pandas as pd
 from utils.data_processing import load_data, filter_data
+from utils.web_scraper import fetch_web_content, extract_wikipedia_section
+from utils.html_extraction import get_paragraphs
+from utils.text_processing import summarize_text
+from utils.content_sources import QUALITY_FACTOR_SOURCES, QUALITY_FACTOR_IMAGES
+from utils.prefetch import start_prefetcher
+from utils.progressive import ProgressiveSections
+from utils.image_proxy import show_image
 
 # Set page configuration
 st.set_page_config(
@@ -13,6 +17,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Keep the external source pages cached in the background
+start_prefetcher()
+
 st.title("Wine Quality Factors")
 st.write("Learn about non-numeric factors that influence wine quality")
 
@@ -47,65 +54,60 @@ quality_range = st.sidebar.slider(
 filtered_df = filter_data(df_combined, wine_type_filter, quality_range)
 st.sidebar.write(f"Filtered samples: {len(filtered_df)}")
 
-# Helper function to fetch and parse web content
-def fetch_web_content(url):
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.text
-    except Exception as e:
-        st.error(f"Error fetching content: {e}")
+# Network-backed sections get placeholders and load in the background
+sections = ProgressiveSections()
+
+def load_summary(url, max_sentences=5, limit=3, section_id=None, keyword=None):
+    """
+    Fetch a page and summarize a section of it (or its first paragraphs).
+    Runs in the background, so it only returns text; None means the fetch failed.
+    """
+    content = fetch_web_content(url, report_errors=False)
+    if not content:
         return None
 
-# Simple text summarization function
-def summarize_text(text, max_sentences=5):
-    # Clean the text
-    clean_text = re.sub(r'\s+', ' ', text).strip()
-    
-    # Split into sentences - this is a simple approach and can be improved
-    sentences = re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s', clean_text)
-    
-    # Select first few sentences for summary (simple extractive summarization)
-    summary_sentences = sentences[:max_sentences]
-    summary = ' '.join(summary_sentences)
-    
-    return summary
+    text = extract_wikipedia_section(content, section_id, url=url) if section_id else None
+
+    # Fall back to the first paragraphs (optionally only those mentioning keyword)
+    if not text:
+        text = " ".join(
+            p for p in get_paragraphs(content, limit=limit, url=url)
+            if keyword is None or keyword in p.lower()
+        )
+    return summarize_text(text, max_sentences=max_sentences) if text else ""
 
 # Main content
 st.header("Non-Numeric Factors Affecting Wine Quality")
 
-# Tabs for different categories of information
-tabs = st.tabs(["Geographical Origin", "Production Technology", "Human Taste", "Wine Types"])
+# Tabs for different categories of information. Only the open tab runs its
+# network-backed sections, so switching tabs fetches at most one page.
+tabs = st.tabs(
+    ["Geographical Origin", "Production Technology", "Human Taste", "Wine Types"],
+    key="quality_factor_tab",
+    on_change="rerun"
+)
 
 # Tab 1: Geographical Origin
 with tabs[0]:
     st.subheader("How Geography Affects Wine Quality")
     
     # Fetch content about geographical origin
-    geo_url = "https://en.wikipedia.org/wiki/Terroir"
+    geo_url = QUALITY_FACTOR_SOURCES["Terroir"]
     
-    with st.expander("What is Terroir?", expanded=True):
-        geo_content = fetch_web_content(geo_url)
-        if geo_content:
-            soup = BeautifulSoup(geo_content, 'html.parser')
-            
-            # Get the first paragraph about terroir
-            terroir_info = ""
-            p_tags = soup.find_all('p')
-            for p in p_tags[:3]:  # First few paragraphs
-                if p.text.strip():
-                    terroir_info += p.text + " "
-            
-            # Summarize
-            if terroir_info:
-                summary = summarize_text(terroir_info)
-                st.write(summary)
-                st.write("Source: [Wikipedia - Terroir](https://en.wikipedia.org/wiki/Terroir)")
-            else:
-                st.write("Could not extract information about terroir.")
+    terroir_expander = st.expander("What is Terroir?", expanded=True, key="terroir_expander", on_change="rerun")
+    with terroir_expander:
+        if tabs[0].open and terroir_expander.open:
+            # Summarize the first paragraphs about terroir
+            def show_terroir(summary):
+                if summary:
+                    st.write(summary)
+                    st.write("Source: [Wikipedia - Terroir](https://en.wikipedia.org/wiki/Terroir)")
+                elif summary is not None:
+                    st.write("Could not extract information about terroir.")
+                else:
+                    st.error(f"Could not fetch content from {geo_url}.")
+
+            sections.defer(lambda: load_summary(geo_url, limit=3), show_terroir, "Fetching information about terroir...")
     
     # Wine regions
     with st.expander("Famous Wine Regions"):
@@ -120,50 +122,36 @@ with tabs[0]:
         - **Marlborough, New Zealand**: Recognized for distinctive Sauvignon Blanc
         """)
         
-        # Display a wine regions map or image
-        st.image("https://upload.wikimedia.org/wikipedia/commons/thumb/0/0c/Wine_regions.svg/1000px-Wine_regions.svg.png", 
-                 caption="World's Major Wine Regions")
+        # Display a wine regions map (resized and served from the local image cache)
+        show_image(*QUALITY_FACTOR_IMAGES["Wine Regions"], caption="World's Major Wine Regions", sections=sections)
 
 # Tab 2: Production Technology
 with tabs[1]:
     st.subheader("Wine Production Technologies")
     
     # Fermentation
-    with st.expander("Fermentation Process", expanded=True):
-        fermentation_url = "https://en.wikipedia.org/wiki/Winemaking"
-        ferment_content = fetch_web_content(fermentation_url)
-        
-        if ferment_content:
-            soup = BeautifulSoup(ferment_content, 'html.parser')
-            
-            # Extract paragraph about fermentation
-            fermentation_info = ""
-            ferment_section = soup.find(id="Fermentation")
-            if ferment_section:
-                parent = ferment_section.parent
-                next_tag = parent.find_next_sibling()
-                
-                while next_tag and next_tag.name == 'p':
-                    fermentation_info += next_tag.text + " "
-                    next_tag = next_tag.find_next_sibling()
-            
-            # If we couldn't find the fermentation section, get some general info
-            if not fermentation_info:
-                p_tags = soup.find_all('p')
-                for p in p_tags[:5]:
-                    if 'fermentation' in p.text.lower():
-                        fermentation_info += p.text + " "
-            
-            # Summarize the information
-            if fermentation_info:
-                summary = summarize_text(fermentation_info)
-                st.write(summary)
-                st.write("Source: [Wikipedia - Winemaking](https://en.wikipedia.org/wiki/Winemaking)")
-            else:
-                st.write("""
-                Fermentation is the process where yeast converts grape sugar into alcohol and carbon dioxide.
-                The type of yeast, fermentation temperature, and duration all affect the final wine quality.
-                """)
+    fermentation_expander = st.expander("Fermentation Process", expanded=True, key="fermentation_expander", on_change="rerun")
+    with fermentation_expander:
+        fermentation_url = QUALITY_FACTOR_SOURCES["Winemaking"]
+        if tabs[1].open and fermentation_expander.open:
+            # Summarize the fermentation section, or paragraphs about fermentation if there is none
+            def show_fermentation(summary):
+                if summary:
+                    st.write(summary)
+                    st.write("Source: [Wikipedia - Winemaking](https://en.wikipedia.org/wiki/Winemaking)")
+                elif summary is not None:
+                    st.write("""
+                    Fermentation is the process where yeast converts grape sugar into alcohol and carbon dioxide.
+                    The type of yeast, fermentation temperature, and duration all affect the final wine quality.
+                    """)
+                else:
+                    st.error(f"Could not fetch content from {fermentation_url}.")
+
+            sections.defer(
+                lambda: load_summary(fermentation_url, limit=5, section_id="Fermentation", keyword='fermentation'),
+                show_fermentation,
+                "Fetching information about fermentation..."
+            )
     
     # Aging
     with st.expander("Aging Techniques"):
@@ -177,8 +165,7 @@ with tabs[1]:
         """)
         
         # Show image of oak barrels
-        st.image("https://upload.wikimedia.org/wikipedia/commons/thumb/3/3c/Oak_barrels_in_Napa_Valley.jpg/1280px-Oak_barrels_in_Napa_Valley.jpg", 
-                 caption="Oak Barrel Aging")
+        show_image(*QUALITY_FACTOR_IMAGES["Oak Barrels"], caption="Oak Barrel Aging", sections=sections)
 
 # Tab 3: Human Taste
 with tabs[2]:
@@ -195,27 +182,22 @@ with tabs[2]:
         - **Finish**: Length and quality of aftertaste
         """)
     
-    with st.expander("Professional Wine Evaluation"):
+    evaluation_expander = st.expander("Professional Wine Evaluation", key="evaluation_expander", on_change="rerun")
+    with evaluation_expander:
         # Fetch content about wine scoring systems
-        scoring_url = "https://en.wikipedia.org/wiki/Wine_rating"
-        score_content = fetch_web_content(scoring_url)
-        
-        if score_content:
-            soup = BeautifulSoup(score_content, 'html.parser')
-            
-            # Extract info about wine scoring
-            scoring_info = ""
-            p_tags = soup.find_all('p')
-            for p in p_tags[:3]:
-                if p.text.strip():
-                    scoring_info += p.text + " "
-            
-            if scoring_info:
-                summary = summarize_text(scoring_info)
-                st.write(summary)
-                st.write("Source: [Wikipedia - Wine Rating](https://en.wikipedia.org/wiki/Wine_rating)")
-            else:
-                st.write("Could not extract information about wine rating systems.")
+        scoring_url = QUALITY_FACTOR_SOURCES["Wine Rating"]
+        if tabs[2].open and evaluation_expander.open:
+            # Summarize info about wine scoring
+            def show_scoring(summary):
+                if summary:
+                    st.write(summary)
+                    st.write("Source: [Wikipedia - Wine Rating](https://en.wikipedia.org/wiki/Wine_rating)")
+                elif summary is not None:
+                    st.write("Could not extract information about wine rating systems.")
+                else:
+                    st.error(f"Could not fetch content from {scoring_url}.")
+
+            sections.defer(lambda: load_summary(scoring_url, limit=3), show_scoring, "Fetching information about wine rating...")
         
         # Add info about major rating systems
         st.write("""
@@ -273,23 +255,17 @@ learning_option = st.selectbox(
 if learning_option == "Wine and Food Pairing":
     st.subheader("Wine and Food Pairing Principles")
     
-    pairing_url = "https://en.wikipedia.org/wiki/Wine_and_food_pairing"
-    pairing_content = fetch_web_content(pairing_url)
+    pairing_url = QUALITY_FACTOR_SOURCES["Wine and Food Pairing"]
     
-    if pairing_content:
-        soup = BeautifulSoup(pairing_content, 'html.parser')
-        
-        # Extract basic principles
-        principles_info = ""
-        p_tags = soup.find_all('p')
-        for p in p_tags[:5]:
-            if p.text.strip():
-                principles_info += p.text + " "
-        
-        if principles_info:
-            summary = summarize_text(principles_info, max_sentences=3)
+    # Summarize the basic principles
+    def show_principles(summary):
+        if summary:
             st.write(summary)
             st.write("Source: [Wikipedia - Wine and Food Pairing](https://en.wikipedia.org/wiki/Wine_and_food_pairing)")
+        elif summary is None:
+            st.error(f"Could not fetch content from {pairing_url}.")
+
+    sections.defer(lambda: load_summary(pairing_url, max_sentences=3, limit=5), show_principles, "Fetching pairing principles...")
     
     # Create a simple pairing table
     st.write("### Quick Pairing Guide")
@@ -329,12 +305,10 @@ elif learning_option == "Understanding Wine Labels":
     col1, col2 = st.columns(2)
     
     with col1:
-        st.image("https://upload.wikimedia.org/wikipedia/commons/thumb/b/b9/Australian_wine_label.jpg/800px-Australian_wine_label.jpg",
-                 caption="Example of an Australian Wine Label")
+        show_image(*QUALITY_FACTOR_IMAGES["Australian Label"], caption="Example of an Australian Wine Label", sections=sections)
         
     with col2:
-        st.image("https://upload.wikimedia.org/wikipedia/commons/thumb/7/71/Etiquette_vin_AOC_Bordeaux.jpg/800px-Etiquette_vin_AOC_Bordeaux.jpg",
-                 caption="Example of a French Wine Label")
+        show_image(*QUALITY_FACTOR_IMAGES["French Label"], caption="Example of a French Wine Label", sections=sections)
 
 else:  # Wine Storage Tips
     st.subheader("Proper Wine Storage")
@@ -359,4 +333,7 @@ else:  # Wine Storage Tips
     }
     
     storage_df = pd.DataFrame(storage_data)
-    st.table(storage_df)
\ No newline at end of file
+    st.table(storage_df)
+
+# Fill in the network-backed sections as their content arrives
+sections.render()
@@ -1,12 +1,16 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from utils.data_processing import load_data, filter_data
 from visualizations.basic_viz import plot_wine_distribution, plot_quality_distribution, plot_correlation_matrix
 from visualizations.feature_viz import plot_feature_comparison, plot_feature_vs_quality
-from visualizations.advanced_viz import create_3d_scatter
+from visualizations.advanced_viz import create_3d_voxel_scatter
+from visualizations.plotly_output import show_cached_figure
+from visualizations.render_executor import FigureJob, render_figures
+from utils.feature_importance import (
+    IMPORTANCE_COLUMNS, CORRELATION_MEASURES, IMPORTANCE_POLL_SECONDS, get_correlation_importance,
+    start_feature_importance, get_importance_status, rank_drivers
+)
 
 # Set page configuration
 st.set_page_config(
@@ -75,37 +79,54 @@ with col4:
     avg_alcohol = filtered_df['alcohol'].mean()
     st.metric("Average Alcohol", f"{avg_alcohol:.2f}%")
 
+# Choose 2 important features to compare
+important_features = ['alcohol', 'residual sugar'] 
+
+# Get only numeric columns for the correlation matrix, and limit to most important features
+numeric_cols = filtered_df.select_dtypes(include=[np.number]).columns.tolist()
+selected_cols = ['fixed acidity', 'volatile acidity', 'citric acid', 'residual sugar', 
+                'chlorides', 'alcohol', 'pH', 'sulphates', 'quality']
+# Ensure all selected columns exist in the dataset
+selected_cols = [col for col in selected_cols if col in numeric_cols]
+
+# Declare every matplotlib figure up front so they render in parallel, in layout order
+figure_jobs = [
+    FigureJob(plot_wine_distribution, filtered_df, {}),
+    FigureJob(plot_quality_distribution, filtered_df, {}),
+    FigureJob(plot_feature_comparison, filtered_df, {'feature': important_features[0]}),
+    FigureJob(plot_feature_comparison, filtered_df, {'feature': important_features[1]}),
+    FigureJob(plot_feature_vs_quality, filtered_df, {'feature': important_features[0]}),
+    FigureJob(plot_feature_vs_quality, filtered_df, {'feature': important_features[1]}),
+    FigureJob(plot_correlation_matrix, filtered_df[selected_cols], {'size': (10, 8)})
+]
+
+with st.spinner("Rendering charts..."):
+    fig1, fig2, fig3, fig4, fig5, fig6, fig7 = render_figures(figure_jobs)
+
 # Row 1: Wine Distribution and Quality Distribution
 st.header("Wine Types and Quality")
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Wine Type Distribution")
-    fig1 = plot_wine_distribution(filtered_df)
-    st.pyplot(fig1)
+    st.image(fig1, use_container_width=True)
 
 with col2:
     st.subheader("Quality Distribution")
-    fig2 = plot_quality_distribution(filtered_df)
-    st.pyplot(fig2)
+    st.image(fig2, use_container_width=True)
 
 # Row 2: Key Feature Comparisons
 st.header("Key Feature Comparisons")
 
-# Choose 2 important features to compare
-important_features = ['alcohol', 'residual sugar'] 
-
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader(f"Average {important_features[0]} by Wine Type")
-    fig3 = plot_feature_comparison(filtered_df, important_features[0])
-    st.pyplot(fig3)
+    st.image(fig3, use_container_width=True)
 
 with col2:
     st.subheader(f"Average {important_features[1]} by Wine Type")
-    fig4 = plot_feature_comparison(filtered_df, important_features[1])
-    st.pyplot(fig4)
+    st.image(fig4, use_container_width=True)
 
 # Row 3: Feature vs Quality
 st.header("Quality Drivers")
@@ -114,42 +135,79 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader(f"Effect of {important_features[0]} on Wine Quality")
-    fig5 = plot_feature_vs_quality(filtered_df, important_features[0])
-    st.pyplot(fig5)
+    st.image(fig5, use_container_width=True)
 
 with col2:
     st.subheader(f"Effect of {important_features[1]} on Wine Quality")
-    fig6 = plot_feature_vs_quality(filtered_df, important_features[1])
-    st.pyplot(fig6)
+    st.image(fig6, use_container_width=True)
+
+# Rank every feature by several importance measures. The model-based measures
+# are computed in the background; the cached correlation ranking is shown
+# until they are ready.
+if len(filtered_df) > 0:
+    start_feature_importance(filtered_df, reference_df=df_combined)
+    importance_status = get_importance_status(filtered_df, reference_df=df_combined)
+    
+    # Poll while the job runs, then rerun once so the result replaces the placeholder ranking
+    # and polling stops
+    @st.fragment(run_every=IMPORTANCE_POLL_SECONDS if importance_status.state == 'running' else None)
+    def show_driver_ranking():
+        status = get_importance_status(filtered_df, reference_df=df_combined)
+        if status.state != 'running' and importance_status.state == 'running':
+            st.rerun(scope="app")
+        
+        st.subheader("Driver Ranking")
+        if status.state == 'ready':
+            importance = status.importance
+            measures = list(IMPORTANCE_COLUMNS)
+        else:
+            importance = get_correlation_importance(filtered_df)
+            measures = list(CORRELATION_MEASURES)
+            if status.state == 'failed':
+                st.warning(f"Model-based importance could not be computed: {status.message}")
+                if st.button("Try again"):
+                    start_feature_importance(filtered_df, reference_df=df_combined, retry=True)
+                    st.rerun(scope="app")
+            else:
+                st.caption("Mutual information and permutation importance are being computed in the background. Showing the correlation ranking until they are ready.")
+        
+        ranking_measure = st.selectbox(
+            "Rank features by:",
+            options=measures,
+            index=measures.index('permutation') if 'permutation' in measures else 0,
+            format_func=IMPORTANCE_COLUMNS.get
+        )
+        ranked_drivers = rank_drivers(importance, ranking_measure)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.bar_chart(ranked_drivers[IMPORTANCE_COLUMNS[ranking_measure]])
+        with col2:
+            st.dataframe(ranked_drivers.style.format("{:.4f}"), use_container_width=True)
+    
+    show_driver_ranking()
 
 # Row 4: Correlation Heatmap
 st.header("Feature Correlations")
 st.subheader("Correlation Matrix")
-# Get only numeric columns for the correlation matrix, and limit to most important features
-numeric_cols = filtered_df.select_dtypes(include=[np.number]).columns.tolist()
-selected_cols = ['fixed acidity', 'volatile acidity', 'citric acid', 'residual sugar', 
-                'chlorides', 'alcohol', 'pH', 'sulphates', 'quality']
-# Ensure all selected columns exist in the dataset
-selected_cols = [col for col in selected_cols if col in numeric_cols]
-
-# Calculate correlation matrix for selected columns
-corr_df = filtered_df[selected_cols]
-fig7 = plot_correlation_matrix(corr_df, size=(10, 8))
-st.pyplot(fig7)
+st.image(fig7, use_container_width=True)
 
 # Row 5: 3D Visualization
 st.header("3D Visualization")
 st.subheader("Relationship between Key Features")
 
 # This will show a 3D scatter plot of alcohol, residual sugar, and quality
-fig8 = create_3d_scatter(filtered_df, 'alcohol', 'residual sugar', 'quality')
-st.plotly_chart(fig8, use_container_width=True)
+# (dense regions are aggregated into voxels once the filter exceeds the point budget)
+show_cached_figure(
+    ('3d_voxel_scatter', 'alcohol', 'residual sugar', 'quality'),
+    create_3d_voxel_scatter, filtered_df, 'alcohol', 'residual sugar', 'quality'
+)
 
 # Add insights section at the bottom
 st.header("Key Insights")
 
-# Calculate correlations with quality
-quality_corr = filtered_df.corr()['quality'].drop('quality').sort_values(ascending=False)
+# Correlations with quality come from the cached correlation matrices
+quality_corr = get_correlation_importance(filtered_df)[IMPORTANCE_COLUMNS['pearson']].sort_values(ascending=False) if len(filtered_df) > 0 else pd.Series(dtype=float)
 
 # Find the top positive and negative correlations
 top_pos = quality_corr.head(3)
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from utils.data_processing import load_data, get_wine_statistics, get_feature_descriptions, filter_data
+from utils.correlation import CORRELATION_METHODS, get_correlation_matrices
 from visualizations.basic_viz import plot_correlation_matrix, plot_quality_distribution
 
 # Set page configuration
@@ -88,13 +89,26 @@ st.dataframe(filtered_df.describe(), use_container_width=True)
 
 # Correlation analysis
 st.header("Correlation Analysis")
+col1, col2 = st.columns(2)
+
+with col1:
+    corr_method = st.radio(
+        "Correlation method:",
+        options=list(CORRELATION_METHODS),
+        format_func=CORRELATION_METHODS.get,
+        horizontal=True
+    )
+
+with col2:
+    significant_only = st.checkbox("Hide correlations that are not significant (p < 0.05)")
+
 st.subheader("Correlation Matrix")
-fig = plot_correlation_matrix(filtered_df)
+fig = plot_correlation_matrix(filtered_df, method=corr_method, alpha=0.05 if significant_only else None)
 st.pyplot(fig)
 
 # Features most correlated with quality
 st.subheader("Features Correlated with Quality")
-corr_matrix = filtered_df.select_dtypes(include=[np.number]).corr()
+corr_matrix = get_correlation_matrices(filtered_df, methods=(corr_method,))[corr_method]
 quality_corr = corr_matrix['quality'].drop('quality').sort_values(ascending=False)
 
 col1, col2 = st.columns(2)
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from utils.data_processing import load_data, filter_data, get_correlation_stats
+from utils.correlation import CORRELATION_METHODS, get_correlation_matrices
 from visualizations.feature_viz import plot_feature_pair
 
 # Set page configuration
@@ -78,21 +79,30 @@ st.pyplot(fig)
 # Display correlation statistics
 st.header("Correlation Statistics")
 
+corr_method = st.radio(
+    "Correlation method:",
+    options=list(CORRELATION_METHODS),
+    format_func=CORRELATION_METHODS.get,
+    horizontal=True
+)
+
 # Overall correlation
-overall_corr, overall_interp = get_correlation_stats(filtered_df, x_feature, y_feature)
+overall_corr, overall_interp, overall_p, overall_ci = get_correlation_stats(filtered_df, x_feature, y_feature, method=corr_method)
 st.write(f"**Overall correlation:** {overall_corr:.4f} ({overall_interp})")
+st.write(f"p-value: {overall_p:.2e}, 95% CI: [{overall_ci[0]:.4f}, {overall_ci[1]:.4f}]")
 
 # Correlation by wine type
 col1, col2 = st.columns(2)
 
 for i, wine_type in enumerate(filtered_df['wine_type'].unique()):
-    corr, interpretation = get_correlation_stats(filtered_df, x_feature, y_feature, wine_type)
+    corr, interpretation, p_value, ci = get_correlation_stats(filtered_df, x_feature, y_feature, wine_type, method=corr_method)
     
     with col1 if i == 0 else col2:
         st.subheader(f"{wine_type.capitalize()} Wine")
         if corr is not None:
             st.write(f"Correlation: {corr:.4f}")
             st.write(f"Interpretation: {interpretation}")
+            st.write(f"p-value: {p_value:.2e}, 95% CI: [{ci[0]:.4f}, {ci[1]:.4f}]")
         else:
             st.write("Not enough data for correlation analysis")
 
@@ -121,12 +131,13 @@ with col2:
 # Feature combinations with strongest correlations
 st.header("Feature Combinations with Strongest Correlations")
 
-# Calculate all pairwise correlations
+# Calculate all pairwise correlations (read from the cached matrix)
+corr_matrix = get_correlation_matrices(filtered_df, methods=(corr_method,))[corr_method]
 corr_pairs = []
 
 for i, feat1 in enumerate(numeric_cols):
     for feat2 in numeric_cols[i+1:]:  # Avoid duplicates and self-correlations
-        corr = filtered_df[[feat1, feat2]].corr().iloc[0, 1]
+        corr = corr_matrix.loc[feat1, feat2]
         corr_pairs.append({
             'Feature 1': feat1,
             'Feature 2': feat2,
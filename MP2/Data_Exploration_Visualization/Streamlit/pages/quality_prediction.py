@@ -0,0 +1,117 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from utils.data_processing import load_data, filter_data, get_feature_descriptions
+from utils.quality_model import QUALITY_MODELS, get_quality_model, predict_quality
+
+# Set page configuration
+st.set_page_config(
+    page_title="Quality Prediction - Wine Quality Analysis",
+    page_icon="🍷",
+    layout="wide"
+)
+
+st.title("Quality Prediction")
+st.write("Predict wine quality from its chemical profile and explore what-if scenarios")
+
+# Sidebar for filters
+st.sidebar.header("Data Filters")
+
+# Load data
+try:
+    df_combined = load_data("combined_wine_data_cleaned.csv")
+except Exception as e:
+    st.error(f"Error loading data: {e}")
+    st.stop()
+
+# Wine type filter
+available_wine_types = df_combined['wine_type'].unique().tolist()
+wine_type_filter = st.sidebar.multiselect(
+    "Wine Type", 
+    options=available_wine_types,
+    default=available_wine_types
+)
+
+# Quality filter
+min_quality, max_quality = int(df_combined['quality'].min()), int(df_combined['quality'].max())
+quality_range = st.sidebar.slider(
+    "Quality Range", 
+    min_value=min_quality, 
+    max_value=max_quality,
+    value=(min_quality, max_quality)
+)
+
+# Apply filters
+filtered_df = filter_data(df_combined, wine_type_filter, quality_range)
+st.sidebar.write(f"Filtered samples: {len(filtered_df)}")
+
+# Model selection (models are trained on the full dataset, so filters never trigger retraining)
+st.header("Model")
+model_name = st.radio(
+    "Choose a model:",
+    options=list(QUALITY_MODELS),
+    format_func=QUALITY_MODELS.get,
+    horizontal=True
+)
+
+with st.spinner("Loading model..."):
+    model = get_quality_model(df_combined, model_name)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Cross-validated RMSE", f"{model.cv_scores['rmse']:.3f}")
+with col2:
+    st.metric("Cross-validated MAE", f"{model.cv_scores['mae']:.3f}")
+with col3:
+    st.metric("Cross-validated R²", f"{model.cv_scores['r2']:.3f}")
+
+# What-if analysis
+st.header("What-If Analysis")
+st.write("Adjust the chemical profile to see how the predicted quality changes.")
+
+feature_descriptions = get_feature_descriptions()
+chemical_features = [col for col in model.feature_cols if col != 'is_red']
+
+what_if_type = st.radio("Wine type:", options=available_wine_types, horizontal=True)
+reference_df = df_combined[df_combined['wine_type'] == what_if_type]
+
+profile = {'wine_type': what_if_type}
+cols = st.columns(3)
+for i, feature in enumerate(chemical_features):
+    with cols[i % 3]:
+        profile[feature] = st.slider(
+            feature,
+            min_value=float(reference_df[feature].min()),
+            max_value=float(reference_df[feature].max()),
+            value=float(reference_df[feature].median()),
+            help=feature_descriptions.get(feature)
+        )
+
+predicted = predict_quality(model, pd.DataFrame([profile]))[0]
+st.metric("Predicted quality", f"{predicted:.2f}",
+          delta=f"{predicted - reference_df['quality'].mean():+.2f} vs. average {what_if_type} wine")
+
+# Batch prediction for the filtered data
+st.header("Predictions for the Filtered Data")
+
+if len(filtered_df) > 0:
+    prediction_df = filtered_df.copy()
+    prediction_df['predicted quality'] = predict_quality(model, filtered_df)
+    prediction_df['error'] = prediction_df['predicted quality'] - prediction_df['quality']
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("Average predicted vs. actual quality by score:")
+        st.dataframe(
+            prediction_df.groupby('quality')['predicted quality'].agg(['mean', 'count']),
+            use_container_width=True
+        )
+    with col2:
+        st.write(f"Mean absolute error on the filtered data: {prediction_df['error'].abs().mean():.3f}")
+        st.write("Largest prediction errors:")
+        st.dataframe(
+            prediction_df.reindex(prediction_df['error'].abs().sort_values(ascending=False).index).head(10),
+            use_container_width=True
+        )
+else:
+    st.warning("No samples match the selected filters.")
@@ -0,0 +1,123 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from utils.data_processing import load_data, filter_data, get_feature_descriptions
+from utils.similarity_search import get_similarity_features, get_similarity_index, find_similar_wines, query_radius, row_mask
+
+# Set page configuration
+st.set_page_config(
+    page_title="Similar Wines - Wine Quality Analysis",
+    page_icon="🍷",
+    layout="wide"
+)
+
+st.title("Similar Wines")
+st.write("Find the wines whose chemical profile is closest to a sample or to a profile you enter")
+
+# Sidebar for filters
+st.sidebar.header("Data Filters")
+
+# Load data
+try:
+    df_combined = load_data("combined_wine_data_cleaned.csv")
+except Exception as e:
+    st.error(f"Error loading data: {e}")
+    st.stop()
+
+# Wine type filter
+available_wine_types = df_combined['wine_type'].unique().tolist()
+wine_type_filter = st.sidebar.multiselect(
+    "Wine Type", 
+    options=available_wine_types,
+    default=available_wine_types
+)
+
+# Quality filter
+min_quality, max_quality = int(df_combined['quality'].min()), int(df_combined['quality'].max())
+quality_range = st.sidebar.slider(
+    "Quality Range", 
+    min_value=min_quality, 
+    max_value=max_quality,
+    value=(min_quality, max_quality)
+)
+
+# Apply filters
+filtered_df = filter_data(df_combined, wine_type_filter, quality_range)
+st.sidebar.write(f"Filtered samples: {len(filtered_df)}")
+
+if len(filtered_df) == 0:
+    st.warning("No samples match the selected filters.")
+    st.stop()
+
+features = list(get_similarity_features(filtered_df))
+feature_descriptions = get_feature_descriptions()
+
+# Search settings
+st.header("Search Settings")
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    query_mode = st.radio("Search by:", ["Existing sample", "Custom profile"], horizontal=True)
+
+with col2:
+    search_wine_type = st.selectbox(
+        "Search among:",
+        options=["all"] + filtered_df['wine_type'].unique().tolist()
+    )
+
+with col3:
+    n_neighbours = st.slider("Number of similar wines:", min_value=1, max_value=25, value=5)
+
+wine_type_arg = None if search_wine_type == "all" else search_wine_type
+
+# Build the query profile
+st.header("Query Profile")
+
+if query_mode == "Existing sample":
+    sample_label = st.selectbox("Select a sample (row number):", options=filtered_df.index.tolist())
+    profile = filtered_df.loc[sample_label, features]
+    exclude_label = sample_label
+    st.dataframe(filtered_df.loc[[sample_label]], use_container_width=True)
+else:
+    exclude_label = None
+    profile = {}
+    cols = st.columns(3)
+    for i, feature in enumerate(features):
+        with cols[i % 3]:
+            profile[feature] = st.number_input(
+                feature,
+                value=float(filtered_df[feature].median()),
+                format="%.4f",
+                help=feature_descriptions.get(feature)
+            )
+
+# Nearest neighbours
+st.header("Most Similar Wines")
+st.write("Distances are measured on standardized features, so every feature counts equally.")
+
+# The index covers the whole dataset; the filters are applied to the results
+similar_df = find_similar_wines(filtered_df, profile, k=n_neighbours, wine_type=wine_type_arg,
+                                exclude_label=exclude_label, reference_df=df_combined)
+st.dataframe(similar_df, use_container_width=True)
+
+if similar_df.empty:
+    st.info("No similar wines found among the filtered samples.")
+else:
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Average quality of similar wines", f"{similar_df['quality'].mean():.2f}")
+    with col2:
+        st.metric("Most common wine type", similar_df['wine_type'].mode().iloc[0])
+
+# Radius query
+st.header("Wines Within a Distance")
+radius = st.slider("Standardized distance:", min_value=0.1, max_value=5.0, value=1.0, step=0.1)
+
+index = get_similarity_index(df_combined, wine_type_arg)
+neighbour_labels = query_radius(index, profile, radius, row_mask(index, filtered_df.index))[0]
+neighbour_labels = [label for label in neighbour_labels if label != exclude_label]
+
+st.write(f"Wines within distance {radius:.1f}: {len(neighbour_labels)}")
+if neighbour_labels:
+    within_df = filtered_df.loc[neighbour_labels]
+    st.dataframe(within_df['quality'].value_counts().sort_index().rename("Samples"), use_container_width=True)
@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
-from utils.web_scraper import fetch_web_content, search_youtube_videos
+from utils.web_scraper import fetch_web_content
+from utils.video_search import search_youtube_videos, start_video_resolver
+from utils.html_extraction import get_paragraphs
 from utils.text_processing import summarize_text
 from utils.data_processing import load_data, filter_data
+from utils.content_sources import EXPERT_TOPICS, VIDEO_TOPICS, VIDEOS_PER_TOPIC, video_query
+from utils.prefetch import start_prefetcher
+from utils.progressive import ProgressiveSections
 
 # Set page configuration
 st.set_page_config(
@@ -11,6 +16,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Keep the external source pages cached in the background
+start_prefetcher()
+
 st.title("Wine Education Resources")
 st.write("Learn more about wine quality from experts and educational resources")
 
@@ -45,72 +53,72 @@ quality_range = st.sidebar.slider(
 filtered_df = filter_data(df_combined, wine_type_filter, quality_range)
 st.sidebar.write(f"Filtered samples: {len(filtered_df)}")
 
+# Network-backed sections get placeholders and load in the background
+sections = ProgressiveSections()
+
 # Main content
 st.header("Video Resources")
 
 # Topics for YouTube videos
-topics = [
-    "Wine tasting techniques",
-    "Understanding wine quality factors",
-    "How wine aging affects quality",
-    "Wine regions and terroir",
-    "Wine fermentation process explained",
-    "Red vs white wine production differences"
-]
+topics = VIDEO_TOPICS
+
+# Resolve the links for every topic in the background, once per server
+start_video_resolver(tuple(video_query(topic) for topic in topics), VIDEOS_PER_TOPIC)
 
 selected_topic = st.selectbox("Select a topic to explore:", topics)
 
 st.subheader(f"Videos about: {selected_topic}")
 
-# Search for videos on the selected topic
-with st.spinner("Searching for educational videos..."):
-    video_urls = search_youtube_videos(selected_topic + " wine", max_results=3)
+# Search for videos on the selected topic (filled in once the rest of the page is drawn)
+def show_videos(video_urls):
+    if video_urls:
+        for i, url in enumerate(video_urls):
+            video_id = url.split("v=")[1]
+            st.write(f"Video {i+1}:")
+            st.video(url)
+    else:
+        st.write("No videos found for this topic. Try another search term.")
 
-if video_urls:
-    for i, url in enumerate(video_urls):
-        video_id = url.split("v=")[1]
-        st.write(f"Video {i+1}:")
-        st.video(url)
-else:
-    st.write("No videos found for this topic. Try another search term.")
+sections.defer(
+    lambda: search_youtube_videos(video_query(selected_topic), max_results=VIDEOS_PER_TOPIC),
+    show_videos,
+    "Searching for educational videos..."
+)
 
 # Expert insights section
 st.header("Expert Insights")
 
-expert_topics = {
-    "Wine Critics": "https://en.wikipedia.org/wiki/Wine_critic",
-    "Sommelier": "https://en.wikipedia.org/wiki/Sommelier",
-    "Winemaking": "https://en.wikipedia.org/wiki/Winemaking",
-    "Wine Faults": "https://en.wikipedia.org/wiki/Wine_fault"
-}
+expert_topics = EXPERT_TOPICS
 
 selected_expert_topic = st.selectbox("Select a topic to learn about:", list(expert_topics.keys()))
 
-# Fetch and display content for the selected topic
-with st.spinner(f"Fetching information about {selected_expert_topic}..."):
-    url = expert_topics[selected_expert_topic]
-    content = fetch_web_content(url)
+# Fetch and summarize the selected topic in the background
+def load_expert_summary(url):
+    content = fetch_web_content(url, report_errors=False)
+    if not content:
+        return None
     
-    if content:
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Extract the first few paragraphs
-        paragraphs = soup.find_all('p')
-        topic_text = ""
-        for p in paragraphs[:5]:
-            if p.text.strip():
-                topic_text += p.text + " "
-        
-        # Summarize the content
-        if topic_text:
-            summary = summarize_text(topic_text, max_sentences=5)
-            st.write(summary)
-            st.write(f"Source: [Wikipedia - {selected_expert_topic}]({url})")
-        else:
-            st.write(f"Could not extract information about {selected_expert_topic}.")
-    else:
+    # Extract the first few paragraphs (from the cached section index)
+    topic_text = " ".join(get_paragraphs(content, limit=5, url=url))
+    
+    # Summarize the content
+    return summarize_text(topic_text, max_sentences=5) if topic_text else ""
+
+def show_expert_summary(summary):
+    if summary:
+        st.write(summary)
+        st.write(f"Source: [Wikipedia - {selected_expert_topic}]({url})")
+    elif summary is None:
         st.write(f"Could not fetch information about {selected_expert_topic}.")
+    else:
+        st.write(f"Could not extract information about {selected_expert_topic}.")
+
+url = expert_topics[selected_expert_topic]
+sections.defer(
+    lambda: load_expert_summary(url),
+    show_expert_summary,
+    f"Fetching information about {selected_expert_topic}..."
+)
 
 # Interactive Q&A section
 st.header("Wine Quality FAQ")
@@ -279,4 +287,7 @@ st.write("""
 - [Wine Folly](https://winefolly.com/) - Wine education and visual guides
 - [GuildSomm](https://www.guildsomm.com/) - Professional resource for wine knowledge
 - [Court of Master Sommeliers](https://www.mastersommeliers.org/) - Professional wine education
-""")
\ No newline at end of file
+""")
+
+# Fill in the network-backed sections as their content arrives
+sections.render()
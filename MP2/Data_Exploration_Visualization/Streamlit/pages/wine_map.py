@@ -0,0 +1,148 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from utils.data_processing import load_data, filter_data, get_feature_descriptions
+from utils.embedding import DEFAULT_PERPLEXITY, EMBEDDING_MAX_ROWS, start_layout, get_layout_status, wait_for_layout, place_rows, get_layout_frame
+from utils.similarity_search import get_similarity_features
+from visualizations.advanced_viz import create_embedding_scatter
+
+# Set page configuration
+st.set_page_config(
+    page_title="Wine Map - Wine Quality Analysis",
+    page_icon="🍷",
+    layout="wide"
+)
+
+st.title("Wine Map")
+st.write("A 2D t-SNE map of the chemical profiles: wines that are close on the map have similar chemistry")
+
+# Sidebar for filters
+st.sidebar.header("Data Filters")
+
+# Load data
+try:
+    df_combined = load_data("combined_wine_data_cleaned.csv")
+except Exception as e:
+    st.error(f"Error loading data: {e}")
+    st.stop()
+
+# Wine type filter
+available_wine_types = df_combined['wine_type'].unique().tolist()
+wine_type_filter = st.sidebar.multiselect(
+    "Wine Type",
+    options=available_wine_types,
+    default=available_wine_types
+)
+
+# Quality filter
+min_quality, max_quality = int(df_combined['quality'].min()), int(df_combined['quality'].max())
+quality_range = st.sidebar.slider(
+    "Quality Range",
+    min_value=min_quality,
+    max_value=max_quality,
+    value=(min_quality, max_quality)
+)
+
+# Apply filters
+filtered_df = filter_data(df_combined, wine_type_filter, quality_range)
+st.sidebar.write(f"Filtered samples: {len(filtered_df)}")
+
+if len(filtered_df) < 10:
+    st.warning("Select at least 10 samples to build a map.")
+    st.stop()
+
+# Map settings
+st.header("Map Settings")
+col1, col2 = st.columns(2)
+
+with col1:
+    perplexity = st.select_slider(
+        "Perplexity (roughly the number of neighbours each wine pays attention to):",
+        options=[5, 15, 30, 50],
+        value=DEFAULT_PERPLEXITY
+    )
+
+with col2:
+    color_by = st.radio("Color by:", ["wine_type", "quality"], horizontal=True)
+
+# Layouts are computed in the background and stored per filter, so they are
+# shown immediately to later sessions
+status = get_layout_status(filtered_df, perplexity)
+
+if status.state == 'failed':
+    st.error(f"Computing the map failed: {status.message}")
+    if st.button("Try again"):
+        start_layout(filtered_df, perplexity)
+        st.rerun()
+    st.stop()
+
+if status.state in ('missing', 'running'):
+    start_layout(filtered_df, perplexity)
+    st.info(
+        "Computing the map in the background. It is saved when finished, so you can "
+        "leave this page and come back later."
+    )
+    progress_bar = st.progress(0.0, text="Queued")
+    status = wait_for_layout(
+        filtered_df,
+        perplexity,
+        on_progress=lambda fraction, message: progress_bar.progress(min(fraction, 1.0), text=message)
+    )
+    st.rerun()
+
+layout = status.layout
+frame = get_layout_frame(layout, filtered_df)
+if color_by == 'quality':
+    frame['quality'] = frame['quality'].astype(str)
+
+# Place a custom wine on the existing map
+features = list(get_similarity_features(filtered_df))
+feature_descriptions = get_feature_descriptions()
+
+with st.expander("Place a wine on the map"):
+    st.write("Enter a chemical profile to see where it lands. The map is not recomputed.")
+    with st.form("place_profile"):
+        profile = {}
+        cols = st.columns(3)
+        for i, feature in enumerate(features):
+            with cols[i % 3]:
+                profile[feature] = st.number_input(
+                    feature,
+                    value=float(filtered_df[feature].median()),
+                    format="%.4f",
+                    help=feature_descriptions.get(feature)
+                )
+        submitted = st.form_submit_button("Place on map")
+
+st.header("Map")
+fig = create_embedding_scatter(frame, color=color_by)
+
+if submitted:
+    position = place_rows(layout, profile)[0]
+    fig.add_scatter(
+        x=[position[0]],
+        y=[position[1]],
+        mode='markers',
+        marker=dict(symbol='star', size=18, color='black'),
+        name='Your wine'
+    )
+
+st.plotly_chart(fig, use_container_width=True)
+
+n_placed = int(frame['placed'].sum())
+if n_placed:
+    st.write(
+        f"{len(frame) - n_placed} samples were used to compute the map (at most {EMBEDDING_MAX_ROWS}); "
+        f"the other {n_placed} were placed next to their nearest neighbours (crosses)."
+    )
+
+if submitted:
+    # Describe the neighbourhood the profile landed in
+    st.subheader("Your Wine's Neighbourhood")
+    distances = np.hypot(frame['x'] - position[0], frame['y'] - position[1])
+    neighbourhood = frame.loc[distances.nsmallest(25).index]
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Average quality of the 25 closest wines", f"{neighbourhood['quality'].astype(float).mean():.2f}")
+    with col2:
+        st.metric("Most common wine type nearby", neighbourhood['wine_type'].mode().iloc[0])
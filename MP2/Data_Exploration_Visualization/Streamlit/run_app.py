@@ -7,6 +7,17 @@ def run():
     sys.exit(stcli.main())
 
 if __name__ == "__main__":
+    # Print how long each app module and heavy dependency takes to import cold
+    if "--import-report" in sys.argv:
+        from utils.lazy_imports import main as import_report
+        import_report()
+        sys.exit(0)
+    
+    # Fetch, extract and summarize the external content into the offline bundle
+    if "--build-snapshot" in sys.argv:
+        from utils.content_snapshot import main as build_snapshot
+        sys.exit(build_snapshot(sys.argv[1:]))
+    
     # Ensure the data directory exists
     if not os.path.exists("data"):
         os.makedirs("data")
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# App folder: pages import utils and visualizations from here
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+# Keep test artifacts (layouts, models, responses) out of the app's own cache and
+# ignore any offline content bundle; both are read when utils is first imported
+os.environ.setdefault('WINE_APP_CACHE_DIR', tempfile.mkdtemp(prefix='wine-app-test-cache-'))
+os.environ.setdefault('WINE_APP_SNAPSHOT', os.path.join(os.environ['WINE_APP_CACHE_DIR'], 'no-snapshot.json.gz'))
@@ -0,0 +1,68 @@
+"""
+Smoke tests: every page runs to the end in AppTest without raising.
+
+Pages that use the shared process pool must also get real workers; a silent
+fallback to serial execution (e.g. workers re-running the page) fails the test.
+"""
+import os
+import pytest
+from streamlit.testing.v1 import AppTest
+from conftest import APP_DIR
+from utils import http_client, worker_pool
+
+# Seconds a page may take (the wine map computes a t-SNE layout on first load)
+PAGE_TIMEOUT = 600
+
+PAGES = [
+    'main.py',
+    'pages/dashboard.py',
+    'pages/data_overview.py',
+    'pages/feature_relationships.py',
+    'pages/_3D_visualization.py',
+    'pages/quality_prediction.py',
+    'pages/similar_wines.py',
+    'pages/wine_map.py',
+    'pages/wine_education.py',
+    'pages/_wine_quality_factors.py'
+]
+
+class _OfflineSession:
+    """Session whose requests fail at once, as on a server without network access"""
+
+    def get(self, url, **kwargs):
+        raise http_client.requests.ConnectionError(f"offline: {url}")
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    """Keep the tests off the network: fetches fail immediately and are retried without pauses"""
+    monkeypatch.setattr(http_client, 'get_session', _OfflineSession)
+    monkeypatch.setattr(http_client, 'backoff_delay', lambda attempt, retry_after=None: 0)
+
+def run_page(page):
+    """Run a page once and return its AppTest"""
+    return AppTest.from_file(os.path.join(APP_DIR, page), default_timeout=PAGE_TIMEOUT).run()
+
+@pytest.mark.parametrize('page', PAGES)
+def test_page_runs(page):
+    fallbacks = worker_pool.serial_fallbacks()
+    at = run_page(page)
+
+    assert not at.exception
+    assert worker_pool.serial_fallbacks() == fallbacks
+
+def test_wine_map_computes_layout():
+    at = run_page('pages/wine_map.py')
+
+    assert not at.exception
+    assert not at.error
+    assert at.get('plotly_chart')
+
+def test_pca_clusters_use_process_pool():
+    fallbacks = worker_pool.serial_fallbacks()
+    at = run_page('pages/_3D_visualization.py')
+    at.radio[0].set_value('PCA Visualization').run()
+    at.radio(key='pca_color').set_value('Cluster').run()
+
+    assert not at.exception
+    assert at.selectbox(key='pca_k').value is not None
+    assert worker_pool.serial_fallbacks() == fallbacks
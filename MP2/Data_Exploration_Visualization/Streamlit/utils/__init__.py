@@ -0,0 +1,53 @@
+from utils.lazy_imports import lazy_exports
+
+# Public helpers and the submodule that defines each one. Submodules (and the
+# heavy libraries they use) are only imported when a name is first accessed.
+_EXPORTS = {
+    'load_data': 'utils.data_processing',
+    'get_wine_statistics': 'utils.data_processing',
+    'get_feature_descriptions': 'utils.data_processing',
+    'filter_data': 'utils.data_processing',
+    'check_normality': 'utils.data_processing',
+    'get_correlation_stats': 'utils.data_processing',
+    'bin_data_by_ph': 'utils.data_processing',
+    'dataframe_fingerprint': 'utils.data_processing',
+
+    'get_correlation_matrices': 'utils.correlation',
+
+    'summarize_text': 'utils.text_processing',
+    'summarize_texts': 'utils.text_processing',
+
+    'fetch_web_content': 'utils.web_scraper',
+    'extract_wikipedia_section': 'utils.web_scraper',
+
+    'search_youtube_videos': 'utils.video_search',
+    'resolve_videos_batch': 'utils.video_search',
+
+    'get_surface_grid': 'utils.surface_interpolation',
+
+    'get_pca_model': 'utils.pca_service',
+    'get_pca_decomposition': 'utils.pca_service',
+    'project_pca': 'utils.pca_service',
+    'get_incremental_pca_model': 'utils.pca_service',
+
+    'run_model_selection': 'utils.clustering',
+    'assign_clusters': 'utils.clustering',
+    'add_cluster_column': 'utils.clustering',
+
+    'get_similarity_index': 'utils.similarity_search',
+    'query_nearest': 'utils.similarity_search',
+    'query_radius': 'utils.similarity_search',
+    'row_mask': 'utils.similarity_search',
+    'find_similar_wines': 'utils.similarity_search',
+
+    'start_layout': 'utils.embedding',
+    'get_layout_status': 'utils.embedding',
+    'place_rows': 'utils.embedding',
+
+    'get_quality_model': 'utils.quality_model',
+    'predict_quality': 'utils.quality_model'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
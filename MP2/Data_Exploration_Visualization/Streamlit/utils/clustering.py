@@ -0,0 +1,157 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.data_processing import dataframe_fingerprint
+from utils.pca_service import get_pca_features
+from utils.worker_pool import run_in_pool, worker_threads
+from utils.lazy_imports import lazy_import
+
+# scikit-learn is imported on first use
+cluster = lazy_import('sklearn.cluster')
+metrics = lazy_import('sklearn.metrics')
+
+# Number of clusters tried by the model selection sweep
+DEFAULT_K_RANGE = tuple(range(2, 11))
+
+# Rows used to estimate the silhouette score (it is quadratic in the sample size)
+SILHOUETTE_SAMPLE_SIZE = 2000
+
+# A fitted clustering: standardization statistics plus centroids in standardized space
+ClusterModel = namedtuple('ClusterModel', [
+    'feature_cols',
+    'mean',
+    'scale',
+    'centroids',
+    'k',
+    'inertia',
+    'silhouette'
+])
+
+def stratified_sample_indices(strata, sample_size, random_state=0):
+    """
+    Return row positions for a sample that keeps the proportions of each stratum
+    """
+    strata = np.asarray(strata)
+    if len(strata) <= sample_size:
+        return np.arange(len(strata))
+
+    rng = np.random.default_rng(random_state)
+    values, inverse, counts = np.unique(strata, return_inverse=True, return_counts=True)
+    quotas = np.maximum(1, np.round(counts / len(strata) * sample_size).astype(int))
+
+    indices = []
+    for group, quota in enumerate(quotas):
+        members = np.flatnonzero(inverse == group)
+        indices.append(rng.choice(members, size=min(quota, len(members)), replace=False))
+
+    return np.sort(np.concatenate(indices))
+
+def nearest_centroids(X, centroids):
+    """
+    Index of and squared distance to the closest centroid for every row, in one pass
+    """
+    # |x - c|^2 = |x|^2 - 2 x.c + |c|^2, computed for all rows and centroids at once
+    distances = (
+        np.einsum('ij,ij->i', X, X)[:, None]
+        - 2 * X @ centroids.T
+        + np.einsum('ij,ij->i', centroids, centroids)[None, :]
+    )
+    labels = np.argmin(distances, axis=1)
+    return labels, np.maximum(distances[np.arange(len(X)), labels], 0)
+
+def _fit_k(X_std, k, sample_indices, random_state=0):
+    """
+    Fit MiniBatchKMeans for one k and score it (runs in a worker process)
+    """
+    with worker_threads():
+        model = cluster.MiniBatchKMeans(
+            n_clusters=k,
+            batch_size=1024,
+            n_init=3,
+            random_state=random_state
+        ).fit(X_std)
+
+    labels, squared_distances = nearest_centroids(X_std, model.cluster_centers_)
+    sample_labels = labels[sample_indices]
+    if len(np.unique(sample_labels)) > 1:
+        silhouette = metrics.silhouette_score(X_std[sample_indices], sample_labels)
+    else:
+        silhouette = float('nan')
+
+    return model.cluster_centers_, float(squared_distances.sum()), float(silhouette)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _cached_model_selection(fingerprint, feature_cols, k_range, _X, _strata, parallel):
+    """
+    Fit every k in k_range once per data fingerprint and feature set
+    """
+    mean = _X.mean(axis=0)
+    scale = _X.std(axis=0)
+    scale[scale == 0] = 1.0
+    X_std = (_X - mean) / scale
+
+    sample_indices = stratified_sample_indices(_strata, SILHOUETTE_SAMPLE_SIZE)
+    results = run_in_pool(
+        _fit_k,
+        [(X_std, k, sample_indices) for k in k_range],
+        parallel=parallel
+    )
+
+    return {
+        k: ClusterModel(feature_cols, mean, scale, centroids, k, inertia, silhouette)
+        for k, (centroids, inertia, silhouette) in zip(k_range, results)
+    }
+
+def run_model_selection(df, feature_cols=None, k_range=DEFAULT_K_RANGE, parallel=True):
+    """
+    Fit MiniBatchKMeans for every k in k_range, in parallel worker processes.
+
+    Returns a dict mapping k to its ClusterModel. The silhouette score is
+    estimated on a sample stratified by wine type. Results are cached per
+    filter and feature set.
+    """
+    feature_cols = tuple(feature_cols) if feature_cols is not None else get_pca_features(df)
+    fingerprint = dataframe_fingerprint(df, feature_cols)
+    X = df[list(feature_cols)].to_numpy(dtype=float)
+    strata = df['wine_type'].to_numpy() if 'wine_type' in df else np.zeros(len(df))
+
+    return _cached_model_selection(fingerprint, feature_cols, tuple(k_range), X, strata, parallel)
+
+def get_model_selection_table(models):
+    """
+    Summarize a model selection sweep as an elbow/silhouette table
+    """
+    return pd.DataFrame({
+        'k': [model.k for model in models.values()],
+        'Inertia': [model.inertia for model in models.values()],
+        'Silhouette': [model.silhouette for model in models.values()]
+    }).set_index('k')
+
+def best_k(models):
+    """
+    Return the k with the highest silhouette score
+    """
+    scored = {k: model.silhouette for k, model in models.items() if not np.isnan(model.silhouette)}
+    return max(scored, key=scored.get) if scored else min(models)
+
+def assign_clusters(model, df):
+    """
+    Assign rows to the nearest centroid of a fitted model without refitting
+    """
+    X = df[list(model.feature_cols)].to_numpy(dtype=float)
+    labels, _ = nearest_centroids((X - model.mean) / model.scale, model.centroids)
+    return labels
+
+def add_cluster_column(df, k=None, feature_cols=None, column='cluster'):
+    """
+    Return a copy of df with a cluster label column for coloring plots.
+
+    Uses the cached model selection for df; k defaults to the best silhouette.
+    """
+    models = run_model_selection(df, feature_cols)
+    model = models[k] if k is not None else models[best_k(models)]
+
+    clustered_df = df.copy()
+    clustered_df[column] = [f'Cluster {label + 1}' for label in assign_clusters(model, df)]
+    return clustered_df
@@ -0,0 +1,182 @@
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+from utils.content_sources import QUALITY_FACTOR_IMAGES, SUMMARY_BLOCKS, VIDEO_TOPICS, VIDEOS_PER_TOPIC, get_prefetch_urls, video_query
+from utils.disk_cache import atomic_write_bytes
+
+# Bump when the bundle layout changes; bundles of another version are ignored
+SNAPSHOT_VERSION = 3
+
+# Where the bundle is read from and written to
+SNAPSHOT_PATH = os.environ.get(
+    'WINE_APP_SNAPSHOT',
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        'snapshots',
+        f'content-v{SNAPSHOT_VERSION}.json.gz'
+    )
+)
+
+_snapshot = None
+_snapshot_key = None
+_snapshot_lock = threading.Lock()
+
+def text_key(text, max_sentences):
+    """Key of a summary in the bundle: a hash of the source text and the summary length"""
+    return f"{hashlib.sha1(text.encode('utf-8')).hexdigest()}:{max_sentences}"
+
+def load_snapshot(path=None):
+    """
+    Return the content bundle as a dict, or None if there is no usable bundle.
+
+    The file is read once and again only when it changes on disk.
+    """
+    global _snapshot, _snapshot_key
+    path = path or SNAPSHOT_PATH
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    key = (path, stat.st_mtime, stat.st_size)
+    with _snapshot_lock:
+        if _snapshot_key != key:
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    bundle = json.load(f)
+            except (OSError, ValueError):
+                bundle = None
+            _snapshot = bundle if bundle and bundle.get('version') == SNAPSHOT_VERSION else None
+            _snapshot_key = key
+        return _snapshot
+
+def snapshot_page(url):
+    """Return the bundled page for a URL (html, intro, sections, paragraphs), or None"""
+    snapshot = load_snapshot()
+    return snapshot['pages'].get(url) if snapshot else None
+
+def snapshot_summary(text, max_sentences):
+    """Return a bundled summary of text, or None"""
+    snapshot = load_snapshot()
+    return snapshot['summaries'].get(text_key(text, max_sentences)) if snapshot else None
+
+def snapshot_videos(query):
+    """Return the bundled video URLs for a search query, or None"""
+    snapshot = load_snapshot()
+    return snapshot['videos'].get(query) if snapshot else None
+
+def snapshot_image(url, width):
+    """Return the bundled (bytes, format) of an image at width, or None"""
+    snapshot = load_snapshot()
+    image = snapshot['images'].get(url) if snapshot else None
+    if image is None or image['width'] != width:
+        return None
+    return base64.b64decode(image['data']), image['format']
+
+def _source_url(url, source_host):
+    """Fetch from a stand-in host (e.g. a local test server) while keeping the canonical URL as key"""
+    if not source_host:
+        return url
+    parts = urlsplit(url)
+    return source_host.rstrip('/') + parts.path + (f'?{parts.query}' if parts.query else '')
+
+def build_snapshot(path=None, source_host=None, progress=print):
+    """
+    Fetch every configured source, extract and summarize it, and write the bundle.
+
+    source_host replaces the scheme and host of each URL when fetching, so the
+    build can run against a local stand-in server.
+    """
+    # Imported here because these modules read the snapshot themselves
+    from utils.web_scraper import _fetch_web_content
+    from utils.video_search import parse_video_ids
+    from utils.html_extraction import build_section_index, extract_content_body
+    from utils.text_processing import summarize_texts
+    from utils.image_proxy import encode_variant
+
+    path = path or SNAPSHOT_PATH
+    pages, summaries, videos, images, failures = {}, {}, {}, {}, []
+
+    for url in get_prefetch_urls():
+        response = _fetch_web_content(_source_url(url, source_host), report_errors=False)
+        if response is None:
+            failures.append(url)
+            progress(f"FAILED  {url}")
+            continue
+        html_content = extract_content_body(response.text)
+        index = build_section_index(html_content)
+        pages[url] = {
+            'html': html_content,
+            'content_hash': hashlib.sha1(html_content.encode('utf-8', errors='replace')).hexdigest(),
+            'intro': index.intro,
+            'sections': index.sections,
+            'paragraphs': list(index.paragraphs)
+        }
+        progress(f"fetched {url}")
+
+    # Summaries of exactly the text each page block summarizes, batched by length
+    blocks = {}
+    for url, section_id, n_paragraphs, max_sentences in SUMMARY_BLOCKS:
+        page = pages.get(url)
+        if page is None:
+            continue
+        text = page['sections'].get(section_id) if section_id else ' '.join(page['paragraphs'][:n_paragraphs])
+        if text:
+            blocks.setdefault(max_sentences, []).append(text)
+    for max_sentences, texts in blocks.items():
+        for text, summary in zip(texts, summarize_texts(texts, max_sentences=max_sentences)):
+            summaries[text_key(text, max_sentences)] = summary
+
+    for topic in VIDEO_TOPICS:
+        query = video_query(topic)
+        search_url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
+        response = _fetch_web_content(_source_url(search_url, source_host), report_errors=False)
+        if response is None:
+            failures.append(search_url)
+            progress(f"FAILED  {search_url}")
+            continue
+        videos[query] = parse_video_ids(response.text, VIDEOS_PER_TOPIC)
+        progress(f"resolved {query!r}: {len(videos[query])} videos")
+
+    # Page images, already resized and encoded for the width they are shown at
+    for url, width in QUALITY_FACTOR_IMAGES.values():
+        response = _fetch_web_content(_source_url(url, source_host), report_errors=False)
+        if response is None:
+            failures.append(url)
+            progress(f"FAILED  {url}")
+            continue
+        data, image_format = encode_variant(response.content, width)
+        images[url] = {'width': width, 'format': image_format, 'data': base64.b64encode(data).decode('ascii')}
+        progress(f"encoded {url} ({len(data) / 1024:.0f} KiB {image_format})")
+
+    bundle = {
+        'version': SNAPSHOT_VERSION,
+        'created_at': time.time(),
+        'pages': pages,
+        'summaries': summaries,
+        'videos': videos,
+        'images': images
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write_bytes(path, gzip.compress(json.dumps(bundle).encode('utf-8'), 9))
+    progress(f"wrote {path} ({os.path.getsize(path) / 1024:.0f} KiB, {len(pages)} pages, {len(videos)} video topics, {len(images)} images)")
+
+    return failures
+
+def main(argv=None):
+    """Build the offline content bundle (python run_app.py --build-snapshot [--source-host URL])"""
+    parser = argparse.ArgumentParser(description="Build the offline content snapshot bundle")
+    parser.add_argument('--build-snapshot', action='store_true')
+    parser.add_argument('--output', default=None, help=f"bundle path (default: {SNAPSHOT_PATH})")
+    parser.add_argument('--source-host', default=None,
+                        help="fetch from this host instead, e.g. http://localhost:8000")
+    args = parser.parse_args(argv)
+
+    failures = build_snapshot(args.output, args.source_host)
+    return 1 if failures else 0
@@ -0,0 +1,64 @@
+# External pages used by the education and quality-factor pages, kept in one
+# place so they can be prefetched and cached ahead of user requests
+
+# Expert insight topics on the Wine Education page
+EXPERT_TOPICS = {
+    "Wine Critics": "https://en.wikipedia.org/wiki/Wine_critic",
+    "Sommelier": "https://en.wikipedia.org/wiki/Sommelier",
+    "Winemaking": "https://en.wikipedia.org/wiki/Winemaking",
+    "Wine Faults": "https://en.wikipedia.org/wiki/Wine_fault"
+}
+
+# Articles used on the Wine Quality Factors page
+QUALITY_FACTOR_SOURCES = {
+    "Terroir": "https://en.wikipedia.org/wiki/Terroir",
+    "Winemaking": "https://en.wikipedia.org/wiki/Winemaking",
+    "Wine Rating": "https://en.wikipedia.org/wiki/Wine_rating",
+    "Wine and Food Pairing": "https://en.wikipedia.org/wiki/Wine_and_food_pairing"
+}
+
+# Display widths of images on the Wine Quality Factors page: full content width and half (two columns)
+IMAGE_WIDTH_FULL = 960
+IMAGE_WIDTH_HALF = 640
+
+# Images on the Wine Quality Factors page: (url, width they are shown at)
+QUALITY_FACTOR_IMAGES = {
+    "Wine Regions": ("https://upload.wikimedia.org/wikipedia/commons/thumb/0/0c/Wine_regions.svg/1000px-Wine_regions.svg.png", IMAGE_WIDTH_FULL),
+    "Oak Barrels": ("https://upload.wikimedia.org/wikipedia/commons/thumb/3/3c/Oak_barrels_in_Napa_Valley.jpg/1280px-Oak_barrels_in_Napa_Valley.jpg", IMAGE_WIDTH_FULL),
+    "Australian Label": ("https://upload.wikimedia.org/wikipedia/commons/thumb/b/b9/Australian_wine_label.jpg/800px-Australian_wine_label.jpg", IMAGE_WIDTH_HALF),
+    "French Label": ("https://upload.wikimedia.org/wikipedia/commons/thumb/7/71/Etiquette_vin_AOC_Bordeaux.jpg/800px-Etiquette_vin_AOC_Bordeaux.jpg", IMAGE_WIDTH_HALF)
+}
+
+# Video topics on the Wine Education page (searched as "<topic> wine")
+VIDEO_TOPICS = [
+    "Wine tasting techniques",
+    "Understanding wine quality factors",
+    "How wine aging affects quality",
+    "Wine regions and terroir",
+    "Wine fermentation process explained",
+    "Red vs white wine production differences"
+]
+
+# Videos shown per topic
+VIDEOS_PER_TOPIC = 3
+
+# Summaries shown on the pages: (url, section id or None for the first paragraphs,
+# number of paragraphs, sentences in the summary)
+SUMMARY_BLOCKS = [
+    (url, None, 5, 5) for url in EXPERT_TOPICS.values()
+] + [
+    (QUALITY_FACTOR_SOURCES["Terroir"], None, 3, 5),
+    (QUALITY_FACTOR_SOURCES["Winemaking"], "Fermentation", None, 5),
+    (QUALITY_FACTOR_SOURCES["Wine Rating"], None, 3, 5),
+    (QUALITY_FACTOR_SOURCES["Wine and Food Pairing"], None, 5, 3)
+]
+
+def video_query(topic):
+    """Return the YouTube search query for a video topic"""
+    return topic + " wine"
+
+def get_prefetch_urls():
+    """
+    Return every known source URL once, in a stable order
+    """
+    return list(dict.fromkeys(list(EXPERT_TOPICS.values()) + list(QUALITY_FACTOR_SOURCES.values())))
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.data_processing import dataframe_fingerprint
+from utils.lazy_imports import lazy_import
+
+# SciPy is imported on first use
+stats = lazy_import('scipy.stats')
+
+# Supported correlation methods and their display names
+CORRELATION_METHODS = {
+    'pearson': "Pearson's r",
+    'spearman': "Spearman's rho",
+    'kendall': "Kendall's tau"
+}
+
+# Standard error factors for Fisher-z confidence intervals of rank correlations (Fieller et al.)
+_FISHER_SE_FACTORS = {'pearson': 1.0, 'spearman': 1.06, 'kendall': 0.437}
+_FISHER_SE_OFFSETS = {'pearson': 3, 'spearman': 3, 'kendall': 4}
+
+def _standardized_correlation(X):
+    """Correlation matrix of the columns of X with one matrix product"""
+    Z = X - X.mean(axis=0)
+    norms = np.sqrt(np.einsum('ij,ij->j', Z, Z))
+    norms[norms == 0] = np.nan
+    Z = Z / norms
+    return np.clip(Z.T @ Z, -1.0, 1.0)
+
+def correlation_p_values(r, n):
+    """
+    Two-sided p-values for a matrix of Pearson or Spearman coefficients
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = r * np.sqrt((n - 2) / (1 - r ** 2))
+    p = 2 * stats.t.sf(np.abs(t), n - 2)
+    return np.where(np.abs(r) >= 1, 0.0, p)
+
+def correlation_confidence_intervals(r, n, method='pearson', confidence=0.95):
+    """
+    Fisher-z confidence interval bounds for a matrix of correlation coefficients
+    """
+    z_crit = stats.norm.ppf(0.5 + confidence / 2)
+    se = np.sqrt(_FISHER_SE_FACTORS[method] / max(n - _FISHER_SE_OFFSETS[method], 1))
+    z = np.arctanh(np.clip(r, -0.999999, 0.999999))
+    return np.tanh(z - z_crit * se), np.tanh(z + z_crit * se)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_ranks(fingerprint, columns, _data):
+    """
+    Average ranks of every column, computed once per filter for all rank methods
+    """
+    return _data.rank(method='average').to_numpy(dtype=float)
+
+def _dense_codes(ranks):
+    """
+    Integer codes of each column's distinct values, in order (dense ranks from average ranks)
+    """
+    codes = np.empty(ranks.shape, dtype=np.int64)
+    for j in range(ranks.shape[1]):
+        codes[:, j] = np.unique(ranks[:, j], return_inverse=True)[1]
+    return codes
+
+def _kendall_matrix(ranks):
+    """
+    Kendall's tau-b and p-values for every pair, using SciPy's O(n log n) algorithm on integer ranks
+    """
+    dense_ranks = _dense_codes(ranks)
+    k = dense_ranks.shape[1]
+    tau = np.eye(k)
+    p_values = np.zeros((k, k))
+    for i in range(k):
+        for j in range(i + 1, k):
+            tau[i, j], p_values[i, j] = stats.kendalltau(dense_ranks[:, i], dense_ranks[:, j])
+            tau[j, i], p_values[j, i] = tau[i, j], p_values[i, j]
+    return tau, p_values
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_correlations(fingerprint, columns, method, _data):
+    """
+    Compute one correlation matrix and its significance for one filter
+    """
+    n = len(_data)
+    if method == 'pearson':
+        matrix = _standardized_correlation(_data.to_numpy(dtype=float))
+        p_values = correlation_p_values(matrix, n)
+    else:
+        ranks = _cached_ranks(fingerprint, columns, _data)
+        if method == 'kendall':
+            matrix, p_values = _kendall_matrix(ranks)
+        else:
+            # Spearman is Pearson on the ranks of each column
+            matrix = _standardized_correlation(ranks)
+            p_values = correlation_p_values(matrix, n)
+
+    low, high = correlation_confidence_intervals(matrix, n, method)
+    as_frame = lambda values: pd.DataFrame(values, index=columns, columns=columns)
+    return {
+        method: as_frame(matrix),
+        f'{method}_p': as_frame(p_values),
+        f'{method}_ci_low': as_frame(low),
+        f'{method}_ci_high': as_frame(high)
+    }
+
+def get_correlation_matrices(df, columns=None, methods=('pearson', 'spearman')):
+    """
+    Return correlation matrices with p-values and 95% intervals for the given methods.
+
+    Keys are the method names plus '<method>_p', '<method>_ci_low' and
+    '<method>_ci_high'. Each method is computed on first request and cached
+    per filter, so Kendall's tau (the slow one) only runs when it is asked for;
+    the column ranks are shared by Spearman and Kendall.
+
+    Rows with a missing value in any of the columns are dropped (listwise
+    deletion), so every coefficient in a matrix uses the same rows.
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns
+    columns = tuple(columns)
+    data = df[list(columns)].dropna()
+    fingerprint = dataframe_fingerprint(data)
+
+    result = {}
+    for method in methods:
+        result.update(_cached_correlations(fingerprint, columns, method, data))
+    return result
@@ -1,6 +1,10 @@
+import hashlib
 import pandas as pd
 import numpy as np
-from scipy import stats
+from utils.lazy_imports import lazy_import
+
+# SciPy is imported on first use
+stats = lazy_import('scipy.stats')
 
 def load_data(file_path):
     """
@@ -91,19 +95,36 @@ def check_normality(df, column, wine_type=None):
     is_normal = p_value > 0.05
     return stat, p_value, test_name
 
-def get_correlation_stats(df, feature1, feature2, wine_type=None):
+def get_correlation_stats(df, feature1, feature2, wine_type=None, method='pearson'):
     """
-    Get correlation statistics between two features
+    Get correlation statistics between two features.
+
+    Returns the coefficient, its interpretation, the two-sided p-value and a
+    95% confidence interval. method is 'pearson', 'spearman' or 'kendall'.
     """
+    # Imported here because utils.correlation depends on this module
+    from utils.correlation import get_correlation_matrices
+
     if wine_type:
-        data = df[df['wine_type'] == wine_type][[feature1, feature2]].dropna()
+        data = df[df['wine_type'] == wine_type]
     else:
-        data = df[[feature1, feature2]].dropna()
-    
-    if len(data) < 2:
-        return None, "Not enough data"
-    
-    corr = data.corr().iloc[0, 1]
+        data = df
+    
+    pair = data[[feature1, feature2]].dropna()
+    if len(pair) < 2:
+        return None, "Not enough data", None, None
+    
+    # Look the pair up in the cached matrices for all numeric columns of this filter.
+    # Those drop rows missing any column, so with missing values only the pair's own
+    # complete rows are used
+    columns = data.select_dtypes(include=[np.number]).columns
+    if feature1 in columns and feature2 in columns and not data[columns].isna().values.any():
+        matrices = get_correlation_matrices(data, columns, methods=(method,))
+    else:
+        matrices = get_correlation_matrices(pair, [feature1, feature2], methods=(method,))
+    corr = matrices[method].loc[feature1, feature2]
+    p_value = matrices[f'{method}_p'].loc[feature1, feature2]
+    ci = (matrices[f'{method}_ci_low'].loc[feature1, feature2], matrices[f'{method}_ci_high'].loc[feature1, feature2])
     
     if abs(corr) < 0.3:
         strength = "weak"
@@ -115,7 +136,7 @@ def get_correlation_stats(df, feature1, feature2, wine_type=None):
     direction = "positive" if corr > 0 else "negative"
     interpretation = f"{strength} {direction} correlation"
     
-    return corr, interpretation
+    return corr, interpretation, p_value, ci
 
 def bin_data_by_ph(df, n_bins=5):
     """
@@ -148,4 +169,16 @@ def bin_data_by_ph(df, n_bins=5):
     for bin_label in labels:
         subsets[bin_label] = df[df['pH_bin'] == bin_label]
     
-    return subsets, bin_counts, bin_edges
\ No newline at end of file
+    return subsets, bin_counts, bin_edges
+
+def dataframe_fingerprint(df, columns=None, include_index=False):
+    """
+    Return a short hash identifying the contents of a DataFrame (or some of its columns).
+
+    Set include_index when the cached result refers to rows by their labels.
+    """
+    data = df[list(columns)] if columns is not None else df
+    row_hashes = pd.util.hash_pandas_object(data, index=include_index).values
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update('|'.join(map(str, data.columns)).encode('utf-8'))
+    return digest.hexdigest()[:16]
@@ -0,0 +1,46 @@
+import os
+import pickle
+import tempfile
+
+# Root folder for artifacts that should survive a server restart
+CACHE_DIR = os.environ.get(
+    'WINE_APP_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+)
+
+def cache_path(namespace, key, suffix='.pkl'):
+    """
+    Return the file path for a cache entry, creating its folder if needed
+    """
+    folder = os.path.join(CACHE_DIR, namespace)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"{key}{suffix}")
+
+def atomic_write_bytes(path, data):
+    """
+    Write bytes so readers (including other processes) never see a partial file
+    """
+    folder = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def save_pickle(path, obj):
+    """Pickle an object to disk atomically"""
+    atomic_write_bytes(path, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+def load_pickle(path):
+    """
+    Load a pickled object, or return None if it is missing or unreadable
+    """
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
@@ -0,0 +1,303 @@
+import contextlib
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.data_processing import dataframe_fingerprint
+from utils.similarity_search import get_similarity_features
+from utils.clustering import stratified_sample_indices
+from utils.disk_cache import cache_path, atomic_write_bytes, load_pickle, save_pickle
+from utils.worker_pool import submit_to_pool, shutdown_process_pool
+from utils.lazy_imports import lazy_import
+
+# scikit-learn and SciPy are imported on first use
+manifold = lazy_import('sklearn.manifold')
+spatial = lazy_import('scipy.spatial')
+
+# Bump when the layout format or t-SNE settings change so stale files on disk are ignored
+LAYOUT_VERSION = 1
+
+# Rows optimized by t-SNE; the remaining rows are placed into the finished layout
+EMBEDDING_MAX_ROWS = 6000
+
+# t-SNE settings
+DEFAULT_PERPLEXITY = 30
+EMBEDDING_ITERATIONS = 1000
+
+# Neighbours used to place rows that were not part of the optimization
+PLACEMENT_NEIGHBOURS = 10
+
+# A finished 2D layout: standardization statistics, the fitted rows and their coordinates
+EmbeddingLayout = namedtuple('EmbeddingLayout', [
+    'feature_cols',
+    'mean',
+    'scale',
+    'tree',
+    'coordinates',
+    'row_labels',
+    'perplexity'
+])
+
+# Where a layout is: 'ready', 'running', 'failed' or 'missing'
+EmbeddingStatus = namedtuple('EmbeddingStatus', ['state', 'fraction', 'message', 'layout'])
+
+# A submitted layout job and the arguments needed to run it again
+_LayoutJob = namedtuple('_LayoutJob', ['future', 'arguments'])
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_fallback_executor = None
+
+class _ProgressWriter:
+    """
+    File-like object that turns t-SNE's verbose log into a progress file
+    """
+    _ITERATION = re.compile(r'Iteration (\d+):')
+
+    def __init__(self, path, max_iter):
+        self.path = path
+        self.max_iter = max_iter
+        self.buffer = ''
+
+    def write(self, text):
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split('\n')
+        for line in lines:
+            match = self._ITERATION.search(line)
+            if match:
+                iteration = int(match.group(1))
+                write_progress(self.path, 0.1 + 0.9 * iteration / self.max_iter, f"Optimizing layout (iteration {iteration} of {self.max_iter})")
+            elif 'conditional probabilities in' in line:
+                write_progress(self.path, 0.1, "Optimizing layout")
+        return len(text)
+
+    def flush(self):
+        pass
+
+def write_progress(path, fraction, message):
+    """Record the progress of a layout job where any process can read it"""
+    atomic_write_bytes(path, json.dumps({'fraction': fraction, 'message': message}).encode())
+
+def read_progress(path):
+    """
+    Return (fraction, message) for a running job, or (0.0, 'Queued') if unknown
+    """
+    try:
+        with open(path) as f:
+            progress = json.load(f)
+        return progress['fraction'], progress['message']
+    except (OSError, ValueError, KeyError):
+        return 0.0, "Queued"
+
+def _compute_layout(X, row_labels, feature_cols, perplexity, layout_path, progress_path, report_iterations=True):
+    """
+    Run Barnes-Hut t-SNE on standardized features and persist the layout.
+
+    In a worker process the verbose t-SNE log is redirected into the progress
+    file. Elsewhere stdout is shared with the whole server, so report_iterations
+    must be False and only coarse progress is recorded.
+    """
+    write_progress(progress_path, 0.02, "Finding nearest neighbours")
+
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    X_std = (X - mean) / scale
+
+    tsne = manifold.TSNE(
+        n_components=2,
+        perplexity=min(perplexity, (len(X) - 1) / 3),
+        max_iter=EMBEDDING_ITERATIONS,
+        init='pca',
+        method='barnes_hut',
+        random_state=0,
+        verbose=2 if report_iterations else 0
+    )
+    if report_iterations:
+        with contextlib.redirect_stdout(_ProgressWriter(progress_path, EMBEDDING_ITERATIONS)):
+            coordinates = tsne.fit_transform(X_std)
+    else:
+        write_progress(progress_path, 0.1, "Optimizing layout")
+        coordinates = tsne.fit_transform(X_std)
+
+    layout = EmbeddingLayout(feature_cols, mean, scale, spatial.cKDTree(X_std), coordinates, row_labels, perplexity)
+    save_pickle(layout_path, layout)
+    write_progress(progress_path, 1.0, "Done")
+    return layout_path
+
+def _layout_paths(df, perplexity):
+    """Return the layout and progress file paths for a filter and perplexity"""
+    feature_cols = get_similarity_features(df)
+    key = f"v{LAYOUT_VERSION}-{dataframe_fingerprint(df, feature_cols, include_index=True)}-p{perplexity}"
+    return cache_path('embeddings', key), cache_path('embeddings', key, suffix='.progress.json'), feature_cols
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _load_layout(layout_path, modified):
+    """
+    Load a finished layout from disk once per process (and again if the file changes).
+
+    Raises ValueError for an unreadable file, so that no failed read is cached.
+    """
+    layout = load_pickle(layout_path)
+    if not isinstance(layout, EmbeddingLayout):
+        raise ValueError(f"Unreadable layout file: {layout_path}")
+    return layout
+
+def _read_layout(layout_path):
+    """
+    Return the stored layout, or None if there is none.
+
+    A file that cannot be read (truncated, or written by other library
+    versions) is deleted so the layout is computed again.
+    """
+    try:
+        modified = os.path.getmtime(layout_path)
+    except OSError:
+        return None
+
+    try:
+        return _load_layout(layout_path, modified)
+    except ValueError:
+        try:
+            os.remove(layout_path)
+        except OSError:
+            pass
+        return None
+
+def _submit_to_thread(arguments):
+    """Run a layout job in the background thread used when the process pool is unavailable"""
+    global _fallback_executor
+    if _fallback_executor is None:
+        _fallback_executor = ThreadPoolExecutor(max_workers=1)
+    return _LayoutJob(_fallback_executor.submit(_compute_layout, *arguments, False), arguments)
+
+def _submit(arguments):
+    """Submit a layout job to the process pool, or to a background thread if the pool is unavailable"""
+    try:
+        return _LayoutJob(submit_to_pool(_compute_layout, *arguments), arguments)
+    except (BrokenProcessPool, OSError):
+        shutdown_process_pool()
+        return _submit_to_thread(arguments)
+
+def start_layout(df, perplexity=DEFAULT_PERPLEXITY):
+    """
+    Start computing the layout for df in the background unless it exists or is running.
+
+    At most EMBEDDING_MAX_ROWS rows (stratified by wine type) are optimized;
+    the others are placed into the layout when it is displayed.
+    """
+    layout_path, progress_path, feature_cols = _layout_paths(df, perplexity)
+    if _read_layout(layout_path) is not None:
+        return
+
+    with _jobs_lock:
+        # A finished job whose layout cannot be read is started again
+        job = _jobs.get(layout_path)
+        if job is not None and not job.future.done():
+            return
+
+        sample = df
+        if len(df) > EMBEDDING_MAX_ROWS:
+            strata = df['wine_type'].to_numpy() if 'wine_type' in df else np.zeros(len(df))
+            sample = df.iloc[stratified_sample_indices(strata, EMBEDDING_MAX_ROWS)]
+
+        write_progress(progress_path, 0.0, "Queued")
+        _jobs[layout_path] = _submit((
+            sample[list(feature_cols)].to_numpy(dtype=float),
+            sample.index.to_numpy(),
+            feature_cols,
+            perplexity,
+            layout_path,
+            progress_path
+        ))
+
+def get_layout_status(df, perplexity=DEFAULT_PERPLEXITY):
+    """
+    Return the EmbeddingStatus of the layout for df.
+
+    Finished layouts are read from disk, so they are served instantly to every
+    session and after a restart. Running jobs report progress from their
+    progress file.
+    """
+    layout_path, progress_path, _ = _layout_paths(df, perplexity)
+    layout = _read_layout(layout_path)
+    if layout is not None:
+        return EmbeddingStatus('ready', 1.0, "Done", layout)
+
+    with _jobs_lock:
+        job = _jobs.get(layout_path)
+        if job is not None and job.future.done() and isinstance(job.future.exception(), BrokenProcessPool):
+            # The worker process died, not the computation: run the job again in a thread
+            job = _jobs[layout_path] = _submit_to_thread(job.arguments)
+    if job is None:
+        return EmbeddingStatus('missing', 0.0, "Not computed", None)
+    if job.future.done():
+        if job.future.exception() is not None:
+            return EmbeddingStatus('failed', 0.0, str(job.future.exception()), None)
+        # Finished, but the saved layout could not be read back
+        return EmbeddingStatus('failed', 0.0, "The saved layout could not be read", None)
+
+    fraction, message = read_progress(progress_path)
+    return EmbeddingStatus('running', fraction, message, None)
+
+def wait_for_layout(df, perplexity=DEFAULT_PERPLEXITY, on_progress=None, interval=0.5):
+    """
+    Block until the layout for df is finished, calling on_progress(fraction, message) while waiting
+    """
+    status = get_layout_status(df, perplexity)
+    while status.state == 'running':
+        if on_progress is not None:
+            on_progress(status.fraction, status.message)
+        time.sleep(interval)
+        status = get_layout_status(df, perplexity)
+    return status
+
+def place_rows(layout, rows, k=PLACEMENT_NEIGHBOURS):
+    """
+    Place new rows into an existing layout without recomputing it.
+
+    Each row is put at the inverse-distance weighted mean position of its k
+    nearest fitted rows in standardized feature space. rows may be a
+    DataFrame, a profile dict or an array.
+    """
+    if isinstance(rows, dict):
+        rows = pd.DataFrame([rows])
+    if isinstance(rows, pd.DataFrame):
+        rows = rows[list(layout.feature_cols)].to_numpy(dtype=float)
+
+    X_std = (np.atleast_2d(rows) - layout.mean) / layout.scale
+    k = min(k, len(layout.coordinates))
+    distances, neighbours = layout.tree.query(X_std, k=k)
+    distances = distances.reshape(len(X_std), k)
+    neighbours = neighbours.reshape(len(X_std), k)
+
+    weights = 1.0 / np.maximum(distances, 1e-9)
+    weights /= weights.sum(axis=1, keepdims=True)
+    return np.einsum('ij,ijk->ik', weights, layout.coordinates[neighbours])
+
+def get_layout_frame(layout, df):
+    """
+    Return df with 'x' and 'y' layout coordinates and a 'placed' flag.
+
+    Rows that were optimized keep their coordinates; any other rows are placed.
+    """
+    positions = pd.Series(np.arange(len(layout.row_labels)), index=layout.row_labels)
+    fitted = df.index.isin(layout.row_labels)
+
+    coordinates = np.empty((len(df), 2))
+    coordinates[fitted] = layout.coordinates[positions.loc[df.index[fitted]].to_numpy()]
+    if (~fitted).any():
+        coordinates[~fitted] = place_rows(layout, df[~fitted])
+
+    frame = df.copy()
+    frame['x'] = coordinates[:, 0]
+    frame['y'] = coordinates[:, 1]
+    frame['placed'] = ~fitted
+    return frame
@@ -0,0 +1,175 @@
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.data_processing import dataframe_fingerprint
+from utils.correlation import get_correlation_matrices
+from utils.quality_model import build_design_matrix, get_quality_model
+from utils.similarity_search import get_similarity_features
+from utils.worker_pool import run_in_pool, worker_threads
+from utils.lazy_imports import lazy_import
+
+# scikit-learn is imported on first use
+feature_selection = lazy_import('sklearn.feature_selection')
+
+# Number of shuffles per feature for permutation importance
+PERMUTATION_REPEATS = 5
+
+# Columns of the importance table, in display order
+IMPORTANCE_COLUMNS = {
+    'pearson': 'Pearson r',
+    'spearman': 'Spearman rho',
+    'mutual_info': 'Mutual information',
+    'permutation': 'Permutation importance'
+}
+
+# Measures available before the model-based ones are computed
+CORRELATION_MEASURES = ('pearson', 'spearman')
+
+# Seconds between checks by pages waiting for a background importance table
+IMPORTANCE_POLL_SECONDS = 2
+
+# Background importance jobs kept (finished ones are dropped oldest first)
+IMPORTANCE_MAX_JOBS = 32
+
+# Where an importance table is: 'ready', 'running', 'failed' or 'missing'
+ImportanceStatus = namedtuple('ImportanceStatus', ['state', 'message', 'importance'])
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_executor = None
+
+def _permutation_scores(estimator, X, y, column, repeats, seed):
+    """
+    Increase in mean squared error when one column is shuffled (runs in a worker process)
+    """
+    rng = np.random.default_rng(seed)
+    with worker_threads():
+        baseline = np.mean((estimator.predict(X) - y) ** 2)
+
+        X_permuted = X.copy()
+        increases = []
+        for _ in range(repeats):
+            X_permuted[:, column] = rng.permutation(X[:, column])
+            increases.append(np.mean((estimator.predict(X_permuted) - y) ** 2) - baseline)
+
+    return float(np.mean(increases))
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_importance(fingerprint, model_fingerprint, model_name, _df, _model, parallel):
+    """
+    Compute every importance measure for one filter and dataset version
+    """
+    features = [col for col in _model.feature_cols if col != 'is_red']
+    X = build_design_matrix(_df, _model.feature_cols)
+    y = _df['quality'].to_numpy(dtype=float)
+
+    correlations = get_correlation_matrices(_df, features + ['quality'])
+    pearson = correlations['pearson']['quality'].loc[features]
+    spearman = correlations['spearman']['quality'].loc[features]
+    mutual_info = feature_selection.mutual_info_regression(X[:, :len(features)], y, random_state=0)
+
+    # One independent permutation job per feature, spread over the worker pool
+    permutation = run_in_pool(
+        _permutation_scores,
+        [(_model.estimator, X, y, i, PERMUTATION_REPEATS, i) for i in range(len(features))],
+        parallel=parallel
+    )
+
+    return pd.DataFrame({
+        IMPORTANCE_COLUMNS['pearson']: pearson.values,
+        IMPORTANCE_COLUMNS['spearman']: spearman.values,
+        IMPORTANCE_COLUMNS['mutual_info']: mutual_info,
+        IMPORTANCE_COLUMNS['permutation']: permutation
+    }, index=features)
+
+def get_feature_importance(df, reference_df=None, model_name='gradient_boosting', parallel=True):
+    """
+    Return a table of quality drivers for the rows of df.
+
+    Includes Pearson and Spearman correlation with quality, mutual information
+    and permutation importance under the quality model trained on reference_df
+    (defaults to df). Results are cached per filter and dataset version.
+    """
+    reference_df = reference_df if reference_df is not None else df
+    model = get_quality_model(reference_df, model_name)
+
+    return _cached_importance(
+        dataframe_fingerprint(df),
+        model.fingerprint,
+        model_name,
+        df,
+        model,
+        parallel
+    )
+
+def get_correlation_importance(df, features=None):
+    """
+    Return the Pearson and Spearman columns of the importance table from the cached correlations
+    """
+    features = list(features or get_similarity_features(df))
+    correlations = get_correlation_matrices(df, features + ['quality'])
+
+    return pd.DataFrame({
+        IMPORTANCE_COLUMNS['pearson']: correlations['pearson']['quality'].loc[features].values,
+        IMPORTANCE_COLUMNS['spearman']: correlations['spearman']['quality'].loc[features].values
+    }, index=features)
+
+def _job_key(df, reference_df, model_name):
+    """Identify an importance table by filter, dataset version and model"""
+    return dataframe_fingerprint(df), dataframe_fingerprint(reference_df), model_name
+
+def start_feature_importance(df, reference_df=None, model_name='gradient_boosting', parallel=True, retry=False):
+    """
+    Compute the importance table for df in a background thread unless it is running or done.
+
+    Training the model, mutual information and permutation importance take
+    seconds on a cold cache, so pages start them here and poll
+    get_importance_status instead of blocking. A failed job stays failed
+    until it is started again with retry=True.
+    """
+    global _executor
+    reference_df = reference_df if reference_df is not None else df
+    key = _job_key(df, reference_df, model_name)
+
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is not None and (not job.done() or job.exception() is None or not retry):
+            return
+
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='feature-importance')
+        _jobs[key] = _executor.submit(get_feature_importance, df, reference_df, model_name, parallel)
+
+        # Forget the oldest finished tables beyond the limit
+        finished = [k for k, j in _jobs.items() if j.done()]
+        for k in finished[:max(0, len(_jobs) - IMPORTANCE_MAX_JOBS)]:
+            del _jobs[k]
+
+def get_importance_status(df, reference_df=None, model_name='gradient_boosting'):
+    """
+    Return the ImportanceStatus of the table for df, with the table once it is ready
+    """
+    reference_df = reference_df if reference_df is not None else df
+    with _jobs_lock:
+        job = _jobs.get(_job_key(df, reference_df, model_name))
+
+    if job is None:
+        return ImportanceStatus('missing', "Not computed", None)
+    if not job.done():
+        return ImportanceStatus('running', "Computing model-based importance", None)
+    if job.exception() is not None:
+        return ImportanceStatus('failed', str(job.exception()), None)
+    return ImportanceStatus('ready', "Done", job.result())
+
+def rank_drivers(importance, measure='permutation', top_n=None):
+    """
+    Sort features by one importance measure (by absolute value for correlations)
+    """
+    column = IMPORTANCE_COLUMNS[measure]
+    order = importance[column].abs() if measure in ('pearson', 'spearman') else importance[column]
+    ranked = importance.loc[order.sort_values(ascending=False).index]
+
+    return ranked.head(top_n) if top_n else ranked
@@ -0,0 +1,129 @@
+import hashlib
+import re
+from collections import namedtuple
+import streamlit as st
+from utils.lazy_imports import lazy_import
+from utils.content_snapshot import snapshot_page
+
+# The HTML parsing library is imported on first use
+bs4 = lazy_import('bs4')
+
+# Parser used for every document (lxml is several times faster than html.parser)
+HTML_PARSER = 'lxml'
+
+# Container of the article body on Wikipedia pages; parsing is limited to it
+CONTENT_ID = 'mw-content-text'
+
+_HEADING = re.compile(r'^h([1-6])$')
+
+# Paragraph text of one document: the introduction, every section by id, and all paragraphs in order
+SectionIndex = namedtuple('SectionIndex', ['intro', 'sections', 'paragraphs'])
+
+def _parser_name():
+    """Use lxml when it is installed, otherwise the built-in parser"""
+    return HTML_PARSER if bs4.builder.builder_registry.lookup(HTML_PARSER) else 'html.parser'
+
+def _parse_content(html_content):
+    """
+    Parse only the article body when the page has one, otherwise the whole document
+    """
+    parser = _parser_name()
+    soup = bs4.BeautifulSoup(html_content, parser, parse_only=bs4.SoupStrainer(id=CONTENT_ID))
+    if soup.find(id=CONTENT_ID) is None:
+        soup = bs4.BeautifulSoup(html_content, parser)
+
+    return soup.find(class_='mw-parser-output') or soup.find(id=CONTENT_ID) or soup.body or soup
+
+def extract_content_body(html_content):
+    """
+    Return only the article body of a page as HTML (the whole page if it has none)
+    """
+    body = bs4.BeautifulSoup(html_content, _parser_name(), parse_only=bs4.SoupStrainer(id=CONTENT_ID))
+    return str(body) if body.find(id=CONTENT_ID) else html_content
+
+def _heading_of(element):
+    """Return (level, id) if element is a section heading, else None"""
+    heading = element
+    if not _HEADING.match(element.name or ''):
+        # Current Wikipedia markup wraps headings in <div class="mw-heading">
+        if 'mw-heading' not in (element.get('class') or []):
+            return None
+        heading = element.find(_HEADING)
+        if heading is None:
+            return None
+
+    anchor = heading.get('id')
+    if not anchor:
+        # Older markup keeps the id on an inner <span class="mw-headline">
+        span = heading.find(id=True)
+        anchor = span.get('id') if span is not None else heading.get_text(strip=True).replace(' ', '_')
+    return int(heading.name[1]), anchor
+
+def build_section_index(html_content):
+    """
+    Build a SectionIndex in one pass over the top-level blocks of the article.
+
+    A section contains the paragraphs up to the next heading of the same or a
+    higher level, so subsections are included in their parent section.
+    """
+    root = _parse_content(html_content)
+
+    intro, paragraphs, sections = [], [], {}
+    open_sections = []
+    for element in root.find_all(True, recursive=False):
+        heading = _heading_of(element)
+        if heading is not None:
+            level, anchor = heading
+            while open_sections and open_sections[-1][0] >= level:
+                open_sections.pop()
+            open_sections.append((level, anchor))
+            sections.setdefault(anchor, [])
+            continue
+
+        if element.name != 'p':
+            continue
+        text = element.get_text()
+        if not text.strip():
+            continue
+
+        paragraphs.append(text)
+        if not open_sections:
+            intro.append(text)
+        for _, anchor in open_sections:
+            sections[anchor].append(text)
+
+    return SectionIndex(
+        ' '.join(intro),
+        {anchor: ' '.join(texts) for anchor, texts in sections.items()},
+        tuple(paragraphs)
+    )
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_section_index(url, content_hash, _html_content):
+    """Section index for one version of one document"""
+    return build_section_index(_html_content)
+
+def get_section_index(html_content, url=None):
+    """
+    Return the SectionIndex of a document, parsing it only once.
+
+    Indexes are cached by URL and a hash of the content, so every later
+    section lookup on the same page is a dictionary access.
+    """
+    content_hash = hashlib.sha1(html_content.encode('utf-8', errors='replace')).hexdigest()
+
+    # Pages served from the offline bundle come with their index already built
+    page = snapshot_page(url) if url else None
+    if page is not None and page['content_hash'] == content_hash:
+        return SectionIndex(page['intro'], page['sections'], tuple(page['paragraphs']))
+
+    return _cached_section_index(url, content_hash, html_content)
+
+def get_paragraphs(html_content, limit=None, url=None):
+    """
+    Return the text of the first limit non-empty paragraphs of a document
+    """
+    if not html_content:
+        return []
+    paragraphs = get_section_index(html_content, url).paragraphs
+    return list(paragraphs[:limit] if limit else paragraphs)
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import pickle
+import time
+import zlib
+from collections import namedtuple
+from utils.disk_cache import CACHE_DIR, cache_path, atomic_write_bytes
+
+# Seconds a cached response is used without asking the server again
+HTTP_CACHE_MAX_AGE = 3600
+
+# Seconds past HTTP_CACHE_MAX_AGE an expired response is still served while it is refreshed in the background
+HTTP_CACHE_MAX_STALE = 24 * 3600
+
+# Total size of the response cache on disk before the least recently used entries are removed
+HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Bump when the entry format changes so stale files on disk are ignored
+HTTP_CACHE_VERSION = 1
+
+# A cached response: the body is stored zlib-compressed
+CachedResponse = namedtuple('CachedResponse', [
+    'url',
+    'body',
+    'encoding',
+    'etag',
+    'last_modified',
+    'fetched_at'
+])
+
+def _entry_path(url):
+    """Return the cache file for a URL"""
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return cache_path('http', f"v{HTTP_CACHE_VERSION}-{key}", suffix='.bin')
+
+def load_response(url):
+    """
+    Return the CachedResponse for a URL, or None if it is not cached.
+
+    Reading an entry marks it as recently used for eviction.
+    """
+    path = _entry_path(url)
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+        os.utime(path)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    return entry if entry.url == url else None
+
+def response_text(entry):
+    """Decompress and decode the body of a cached response"""
+    return zlib.decompress(entry.body).decode(entry.encoding or 'utf-8', errors='replace')
+
+def is_fresh(entry, max_age=HTTP_CACHE_MAX_AGE):
+    """Check whether a cached response can be used without revalidation"""
+    return time.time() - entry.fetched_at < max_age
+
+def store_response(url, text, encoding=None, etag=None, last_modified=None):
+    """
+    Compress and store a response body with its validators, then enforce the size limit
+    """
+    encoding = encoding or 'utf-8'
+    entry = CachedResponse(
+        url,
+        zlib.compress(text.encode(encoding, errors='replace'), 6),
+        encoding,
+        etag,
+        last_modified,
+        time.time()
+    )
+    atomic_write_bytes(_entry_path(url), pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+    evict_responses()
+    return entry
+
+def mark_revalidated(entry):
+    """
+    Record that the server confirmed a cached response is unchanged (HTTP 304)
+    """
+    refreshed = entry._replace(fetched_at=time.time())
+    atomic_write_bytes(_entry_path(entry.url), pickle.dumps(refreshed, protocol=pickle.HIGHEST_PROTOCOL))
+    return refreshed
+
+def conditional_headers(entry):
+    """Return the If-None-Match / If-Modified-Since headers for revalidating an entry"""
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+    return headers
+
+def evict_responses(max_bytes=HTTP_CACHE_MAX_BYTES):
+    """
+    Delete least recently used responses until the cache fits in max_bytes
+    """
+    folder = os.path.join(CACHE_DIR, 'http')
+    try:
+        entries = [entry for entry in os.scandir(folder) if entry.is_file() and entry.name.endswith('.bin')]
+    except OSError:
+        return
+
+    stats = []
+    for entry in entries:
+        try:
+            stats.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+        except OSError:
+            continue
+
+    total = sum(size for _, size, _ in stats)
+    for _, size, path in sorted(stats):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
@@ -0,0 +1,119 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+from utils.lazy_imports import lazy_import
+
+# requests is imported on first use
+requests = lazy_import('requests')
+adapters = lazy_import('requests.adapters')
+
+# Connection pool: hosts kept, and open connections kept per host
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 8
+
+# Requests allowed in flight to one host at a time, across all sessions
+MAX_CONCURRENT_PER_HOST = 4
+
+# Retries for connection errors, timeouts and these status codes
+MAX_RETRIES = 3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Exponential backoff bounds in seconds (full jitter is applied)
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+REQUEST_TIMEOUT = 10
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': 'max-age=0'
+}
+
+_session = None
+_session_lock = threading.Lock()
+_host_limits = {}
+_host_limits_lock = threading.Lock()
+
+def get_session():
+    """
+    Return the shared requests Session, creating it on first use.
+
+    All fetches reuse its pooled keep-alive connections, so repeated requests
+    to the same host skip the TCP and TLS handshakes.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+
+            # pool_block makes callers wait for a free connection instead of opening extra sockets
+            adapter = adapters.HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                pool_block=True
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+def _host_limit(url):
+    """Return the semaphore limiting concurrent requests to the host of url"""
+    host = urlsplit(url).netloc
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(MAX_CONCURRENT_PER_HOST)
+        return _host_limits[host]
+
+def backoff_delay(attempt, retry_after=None):
+    """
+    Seconds to wait before retry number attempt (0-based): exponential with full jitter.
+
+    A numeric Retry-After header from the server is honoured up to BACKOFF_MAX.
+    """
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def max_fetch_seconds(timeout=REQUEST_TIMEOUT, retries=MAX_RETRIES):
+    """
+    Upper bound on how long http_get takes to give up on an unresponsive URL:
+    every attempt timing out plus the longest pause allowed before each retry
+    """
+    return (retries + 1) * timeout + retries * BACKOFF_MAX
+
+def http_get(url, headers=None, timeout=REQUEST_TIMEOUT, retries=MAX_RETRIES):
+    """
+    GET a URL through the shared session, retrying transient failures.
+
+    Connection errors, timeouts and retryable status codes are retried with
+    exponential backoff; other HTTP errors are raised immediately. Returns the
+    response (including 304 Not Modified).
+    """
+    for attempt in range(retries + 1):
+        retry_after = None
+        try:
+            with _host_limit(url):
+                response = get_session().get(url, headers=headers, timeout=timeout)
+
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                return response
+
+            retry_after = response.headers.get('Retry-After')
+            error = requests.HTTPError(f"{response.status_code} error for url: {url}", response=response)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+
+        if attempt == retries:
+            raise error
+        time.sleep(backoff_delay(attempt, retry_after))
@@ -0,0 +1,164 @@
+import hashlib
+import io
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from utils.content_snapshot import snapshot_image
+from utils.disk_cache import cache_path, atomic_write_bytes
+from utils.http_client import http_get
+from utils.lazy_imports import lazy_import
+from utils.web_scraper import single_flight
+
+# Pillow is imported on first use
+Image = lazy_import('PIL.Image')
+
+# Bump when the variant encoding changes so old files on disk are ignored
+IMAGE_CACHE_VERSION = 1
+
+# Encoder settings for photographs; graphics are stored as optimized PNG
+JPEG_QUALITY = 82
+
+# File extension of each stored variant format
+_EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png'}
+
+# A resized copy of a remote image stored in the local cache
+ImageVariant = namedtuple('ImageVariant', ['path', 'format', 'width', 'height', 'size'])
+
+def _image_key(url):
+    """Cache key of a remote image"""
+    return f"v{IMAGE_CACHE_VERSION}-{hashlib.sha1(url.encode('utf-8')).hexdigest()}"
+
+def _source_path(url):
+    """Cache file holding the original download"""
+    return cache_path('images', f"{_image_key(url)}-source", suffix='.bin')
+
+def _variant_path(url, width, image_format):
+    """Cache file of one width and format of an image"""
+    return cache_path('images', f"{_image_key(url)}-{width}", suffix=_EXTENSIONS[image_format])
+
+def _describe(path, image_format):
+    """Build the ImageVariant for a stored file"""
+    with Image.open(path) as image:
+        width, height = image.size
+    return ImageVariant(path, image_format, width, height, os.path.getsize(path))
+
+def cached_variant(url, width):
+    """Return the stored ImageVariant of url at width, or None if it has not been made yet"""
+    for image_format in _EXTENSIONS:
+        path = _variant_path(url, width, image_format)
+        if os.path.exists(path):
+            try:
+                return _describe(path, image_format)
+            except OSError:
+                return None
+    return None
+
+def _load_source(url):
+    """Return the original image bytes, downloading them only the first time"""
+    path = _source_path(url)
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        pass
+
+    data = http_get(url).content
+    atomic_write_bytes(path, data)
+    return data
+
+def encode_variant(data, width):
+    """
+    Downscale an image to at most width pixels wide and encode it for display.
+
+    Photographs become progressive JPEG; graphics and images with transparency
+    stay PNG (palette images are re-quantized after resizing). Returns
+    (bytes, format).
+    """
+    image = Image.open(io.BytesIO(data))
+    graphic = image.format in ('PNG', 'GIF') or image.mode in ('RGBA', 'LA', 'P')
+    palette = image.mode == 'P'
+    has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+
+    out = io.BytesIO()
+    if graphic:
+        if palette:
+            method = Image.Quantize.FASTOCTREE if has_alpha else Image.Quantize.MEDIANCUT
+            image = image.quantize(256, method=method)
+        image.save(out, 'PNG', optimize=True)
+        return out.getvalue(), 'PNG'
+
+    image.save(out, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return out.getvalue(), 'JPEG'
+
+def _build_variant(url, width):
+    """Store one variant, from the offline content bundle or made from the (once) downloaded original"""
+    bundled = snapshot_image(url, width)
+    if bundled is not None:
+        data, image_format = bundled
+    else:
+        data, image_format = encode_variant(_load_source(url), width)
+    path = _variant_path(url, width, image_format)
+    atomic_write_bytes(path, data)
+    return _describe(path, image_format)
+
+def get_image_variant(url, width):
+    """
+    Return the ImageVariant of a remote image at width, making it if needed.
+
+    Variants in the offline content bundle are used without any download.
+    Otherwise the original is downloaded once and kept, so further widths are
+    made locally; concurrent requests for the same variant share one build.
+    Returns None if the image cannot be downloaded or decoded.
+    """
+    variant = cached_variant(url, width)
+    if variant is not None:
+        return variant
+    try:
+        return single_flight(('image', url, width), lambda: cached_variant(url, width) or _build_variant(url, width))
+    except Exception:
+        return None
+
+def prefetch_images(images, max_workers=4):
+    """
+    Make the variants for a list of (url, width) pairs concurrently
+    """
+    if not images:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(images))) as executor:
+        variants = executor.map(lambda image: get_image_variant(*image), images)
+        return dict(zip(images, variants))
+
+def _display_image(variant, url, caption):
+    """Show a cached variant, or the remote image if no variant could be made"""
+    if variant is None:
+        st.image(url, caption=caption)
+    else:
+        # Matching output_format lets Streamlit send the stored bytes without re-encoding
+        st.image(variant.path, caption=caption, output_format=variant.format)
+
+def show_image(url, width, caption=None, sections=None):
+    """
+    Display a remote image from the local variant cache.
+
+    Images already cached are shown at once. Otherwise the download and resize
+    run in the background when sections (a ProgressiveSections) is given, or
+    inline if not.
+    """
+    variant = cached_variant(url, width)
+    if variant is None and sections is not None:
+        sections.defer(
+            lambda: get_image_variant(url, width),
+            lambda variant: _display_image(variant, url, caption),
+            "Loading image..."
+        )
+        return
+
+    if variant is None:
+        variant = get_image_variant(url, width)
+    _display_image(variant, url, caption)
@@ -0,0 +1,146 @@
+import sys
+import time
+import types
+import threading
+import importlib
+import subprocess
+
+# Heavy third-party modules the app defers until first use
+HEAVY_MODULES = (
+    'matplotlib.pyplot',
+    'seaborn',
+    'plotly.express',
+    'plotly.graph_objects',
+    'scipy.stats',
+    'scipy.spatial',
+    'scipy.interpolate',
+    'sklearn.preprocessing',
+    'sklearn.decomposition',
+    'sklearn.feature_extraction.text',
+    'bs4',
+    'requests',
+    'PIL.Image'
+)
+
+# App modules whose own import cost should stay small
+APP_MODULES = (
+    'utils.data_processing',
+    'utils.text_processing',
+    'utils.web_scraper',
+    'visualizations',
+    'visualizations.basic_viz',
+    'visualizations.feature_viz',
+    'visualizations.advanced_viz'
+)
+
+_import_log = []
+_import_log_lock = threading.Lock()
+
+class LazyModule(types.ModuleType):
+    """
+    Module proxy that imports the real module on first attribute access
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is not None:
+            return module
+
+        with self.__dict__['_lazy_lock']:
+            module = self.__dict__['_lazy_module']
+            if module is None:
+                already_loaded = self.__name__ in sys.modules
+                start = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                elapsed = time.perf_counter() - start
+
+                with _import_log_lock:
+                    _import_log.append({
+                        'module': self.__name__,
+                        'seconds': elapsed,
+                        'already_loaded': already_loaded
+                    })
+                self.__dict__['_lazy_module'] = module
+
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+def lazy_import(name):
+    """
+    Return a proxy for a module that is only imported when first used
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+def lazy_exports(package_name, exports):
+    """
+    Build module-level __getattr__ and __dir__ functions for a package.
+
+    exports maps each public name to the submodule that defines it, so
+    `from package import name` only imports that one submodule.
+    """
+    def __getattr__(name):
+        if name not in exports:
+            raise AttributeError(f"module '{package_name}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(exports[name]), name)
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package_name])) | set(exports))
+
+    return __getattr__, __dir__
+
+def get_import_report():
+    """
+    Return the lazy imports triggered so far in this process, in load order
+    """
+    with _import_log_lock:
+        return list(_import_log)
+
+def measure_cold_import(module_name, python=sys.executable):
+    """
+    Time importing a module in a fresh interpreter, in seconds
+    """
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module_name}; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [python, '-c', code],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+def startup_import_report(modules=APP_MODULES + HEAVY_MODULES):
+    """
+    Measure the cold import time of each module in its own fresh interpreter
+    """
+    report = []
+    for module_name in modules:
+        try:
+            seconds = measure_cold_import(module_name)
+        except (subprocess.CalledProcessError, ValueError):
+            seconds = None
+        report.append((module_name, seconds))
+    return report
+
+def main():
+    """Print the startup import-time report (python run_app.py --import-report)"""
+    print(f"{'Module':<32}{'Cold import (ms)':>18}")
+    for module_name, seconds in startup_import_report():
+        timing = f"{seconds * 1000:.1f}" if seconds is not None else "failed"
+        print(f"{module_name:<32}{timing:>18}")
@@ -0,0 +1,228 @@
+import os
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.data_processing import dataframe_fingerprint
+from utils.lazy_imports import lazy_import
+
+# scikit-learn is imported on first use
+preprocessing = lazy_import('sklearn.preprocessing')
+decomposition = lazy_import('sklearn.decomposition')
+
+# Use randomized SVD once the data matrix has more cells than this
+RANDOMIZED_SOLVER_THRESHOLD = 500_000
+
+# Fit IncrementalPCA over row chunks once the data matrix has more cells than this
+INCREMENTAL_SOLVER_THRESHOLD = 20_000_000
+
+# Rows per chunk when fitting out-of-core
+DEFAULT_CHUNKSIZE = 10_000
+
+# Everything needed to project rows without refitting
+PCAModel = namedtuple('PCAModel', [
+    'feature_cols',
+    'mean',
+    'scale',
+    'components',
+    'explained_variance_ratio',
+    'solver'
+])
+
+def get_pca_features(df, exclude=('quality',)):
+    """
+    Return the numeric feature columns used for PCA
+    """
+    return tuple(
+        col for col in df.select_dtypes(include=[np.number]).columns
+        if col not in exclude
+    )
+
+def choose_pca_solver(n_rows, n_features):
+    """
+    Pick the SVD solver for a data matrix of the given size
+    """
+    cells = n_rows * n_features
+    if cells > INCREMENTAL_SOLVER_THRESHOLD:
+        return 'incremental'
+    return 'randomized' if cells > RANDOMIZED_SOLVER_THRESHOLD else 'full'
+
+def _fit_pca(X, n_components, solver):
+    """Standardize X and fit PCA with the given solver"""
+    scaler = preprocessing.StandardScaler().fit(X)
+    pca = decomposition.PCA(n_components=n_components, svd_solver=solver, random_state=0)
+    pca.fit(scaler.transform(X))
+
+    return scaler, pca
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_pca_model(fingerprint, feature_cols, n_components, _X):
+    """
+    Fit and cache a PCA model once per data fingerprint, feature set and size
+    """
+    solver = choose_pca_solver(*_X.shape)
+    scaler, pca = _fit_pca(_X, n_components, solver)
+
+    return PCAModel(
+        feature_cols=feature_cols,
+        mean=scaler.mean_,
+        scale=scaler.scale_,
+        components=pca.components_,
+        explained_variance_ratio=pca.explained_variance_ratio_,
+        solver=solver
+    )
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_pca_decomposition(fingerprint, feature_cols, _X):
+    """
+    Standardize and decompose with one full SVD, keeping every component
+    """
+    scaler = preprocessing.StandardScaler().fit(_X)
+    X_std = scaler.transform(_X)
+
+    _, singular_values, components = np.linalg.svd(X_std, full_matrices=False)
+
+    # Same sign convention as sklearn: largest loading of each component is positive
+    max_rows = np.argmax(np.abs(components), axis=1)
+    components *= np.sign(components[np.arange(len(components)), max_rows])[:, None]
+
+    explained_variance = singular_values ** 2
+
+    return PCAModel(
+        feature_cols=feature_cols,
+        mean=scaler.mean_,
+        scale=scaler.scale_,
+        components=components,
+        explained_variance_ratio=explained_variance / explained_variance.sum(),
+        solver='full'
+    )
+
+def _min_row_batches(chunks, min_rows):
+    """
+    Yield the chunks, merging any chunk shorter than min_rows (usually the last) into its neighbour
+    """
+    held = None
+    for chunk in chunks:
+        if held is not None and len(held) >= min_rows and len(chunk) >= min_rows:
+            yield held
+            held = chunk
+        else:
+            held = chunk if held is None else np.vstack([held, chunk])
+    if held is not None:
+        yield held
+
+def _fit_incremental_pca(read_chunks, feature_cols, n_components):
+    """
+    Fit a PCA model in two passes over read_chunks(), which yields row blocks of the features.
+
+    Only one chunk is standardized at a time. IncrementalPCA needs at least
+    n_components rows per batch, so a short final chunk is fitted together
+    with the one before it instead of being skipped.
+    """
+    # First pass: standardization statistics
+    scaler = preprocessing.StandardScaler()
+    for X in read_chunks():
+        scaler.partial_fit(X)
+
+    # Second pass: components on the standardized chunks
+    pca = decomposition.IncrementalPCA(n_components=n_components)
+    for X in _min_row_batches(read_chunks(), n_components):
+        pca.partial_fit(scaler.transform(X))
+
+    return PCAModel(
+        feature_cols=feature_cols,
+        mean=scaler.mean_,
+        scale=scaler.scale_,
+        components=pca.components_,
+        explained_variance_ratio=pca.explained_variance_ratio_,
+        solver='incremental'
+    )
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _cached_incremental_pca_model(fingerprint, feature_cols, chunksize, _X):
+    """
+    Fit every component of an in-memory matrix over row chunks, once per data fingerprint
+    """
+    def read_chunks():
+        for start in range(0, len(_X), chunksize):
+            yield _X[start:start + chunksize]
+
+    return _fit_incremental_pca(read_chunks, feature_cols, len(feature_cols))
+
+def truncate_pca_model(model, n_components):
+    """
+    Keep the first n_components of a model (all of them if n_components is None)
+    """
+    if n_components is None:
+        return model
+    return model._replace(
+        components=model.components[:n_components],
+        explained_variance_ratio=model.explained_variance_ratio[:n_components]
+    )
+
+def get_pca_decomposition(df, feature_cols=None):
+    """
+    Return the full decomposition for the rows of df, computed once per filter.
+
+    Scree plots, loadings for any k and projections onto any components are all
+    served from this single cached SVD.
+    """
+    return get_pca_model(df, feature_cols, n_components=None)
+
+def get_pca_model(df, feature_cols=None, n_components=3):
+    """
+    Return the PCA model for the rows of df, fitting it only on a cache miss.
+
+    The cache key is a fingerprint of the selected columns, so each dataset
+    version and filter gets its own model. Small data sets are sliced from the
+    full cached decomposition; large ones use a randomized solver, and very
+    large ones are fitted in row chunks with IncrementalPCA.
+    """
+    feature_cols = tuple(feature_cols) if feature_cols is not None else get_pca_features(df)
+    fingerprint = dataframe_fingerprint(df, feature_cols)
+    X = df[list(feature_cols)].to_numpy(dtype=float)
+
+    solver = choose_pca_solver(*X.shape)
+    if solver == 'incremental':
+        model = _cached_incremental_pca_model(fingerprint, feature_cols, DEFAULT_CHUNKSIZE, X)
+        return truncate_pca_model(model, n_components)
+    if n_components is not None and solver == 'randomized':
+        return _cached_pca_model(fingerprint, feature_cols, n_components, X)
+
+    return truncate_pca_model(_cached_pca_decomposition(fingerprint, feature_cols, X), n_components)
+
+def project_pca(model, df):
+    """
+    Project rows onto a fitted model's components without refitting
+    """
+    X = df[list(model.feature_cols)].to_numpy(dtype=float)
+    return ((X - model.mean) / model.scale) @ model.components.T
+
+def _file_fingerprint(file_path):
+    """Identify a file by path, size and modification time"""
+    stat = os.stat(file_path)
+    return f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _cached_csv_pca_model(file_fingerprint, file_path, feature_cols, n_components, chunksize):
+    """
+    Fit a PCA model over a CSV file in chunks, never holding all rows in memory
+    """
+    columns = list(feature_cols)
+
+    def read_chunks():
+        for chunk in pd.read_csv(file_path, usecols=columns, chunksize=chunksize):
+            yield chunk[columns].to_numpy(dtype=float)
+
+    return _fit_incremental_pca(read_chunks, feature_cols, n_components)
+
+def get_incremental_pca_model(file_path, feature_cols, n_components=3, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Return a PCA model fitted out-of-core over a CSV file with IncrementalPCA.
+
+    Use this for data files too large to load; the model is cached until the
+    file changes and projects rows with project_pca like any other model.
+    """
+    return _cached_csv_pca_model(
+        _file_fingerprint(file_path), file_path, tuple(feature_cols), n_components, chunksize
+    )
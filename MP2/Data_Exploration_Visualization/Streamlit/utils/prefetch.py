@@ -0,0 +1,104 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from utils.content_sources import QUALITY_FACTOR_IMAGES, get_prefetch_urls
+from utils.content_snapshot import snapshot_page
+from utils.http_cache import HTTP_CACHE_MAX_AGE, load_response, is_fresh
+from utils.web_scraper import refresh_web_content
+from utils.image_proxy import prefetch_images
+
+# Threads used to fetch source pages concurrently (per-host limits still apply)
+PREFETCH_WORKERS = 8
+
+# Shortest pause between refresh rounds, in seconds
+PREFETCH_MIN_INTERVAL = 60
+
+# Longest pause after rounds that keep failing (the pause doubles after each one)
+PREFETCH_MAX_BACKOFF = 3600
+
+def network_urls(urls):
+    """
+    Return the URLs that are fetched from the network (not served from the offline bundle)
+    """
+    return [url for url in urls if snapshot_page(url) is None]
+
+def _is_cached_fresh(url):
+    """Whether the cached response for url has not expired"""
+    entry = load_response(url)
+    return entry is not None and is_fresh(entry)
+
+def prefetch_web_content(urls, max_workers=PREFETCH_WORKERS):
+    """
+    Fetch every missing or expired URL concurrently into the shared response cache.
+
+    URLs in the offline content bundle are skipped. Returns a dict mapping each
+    refreshed URL to whether it succeeded (its cached copy is now fresh).
+    """
+    stale = []
+    for url in network_urls(urls):
+        entry = load_response(url)
+        if entry is None or not is_fresh(entry):
+            stale.append((url, entry))
+
+    if not stale:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(stale))) as executor:
+        list(executor.map(lambda item: refresh_web_content(item[0], item[1], report_errors=False), stale))
+
+    # An unreachable site still returns the expired copy, so check the cache itself
+    return {url: _is_cached_fresh(url) for url, _ in stale}
+
+def seconds_until_expiry(urls, max_age=HTTP_CACHE_MAX_AGE):
+    """
+    Seconds until the first cached URL expires (at least PREFETCH_MIN_INTERVAL)
+    """
+    remaining = []
+    for url in network_urls(urls):
+        entry = load_response(url)
+        remaining.append(0 if entry is None else entry.fetched_at + max_age - time.time())
+    return max(PREFETCH_MIN_INTERVAL, min(remaining, default=max_age))
+
+def retry_delay(failed_rounds):
+    """
+    Seconds to wait after failed_rounds failing rounds in a row, doubling
+    from PREFETCH_MIN_INTERVAL up to PREFETCH_MAX_BACKOFF
+    """
+    return min(PREFETCH_MIN_INTERVAL * 2 ** (failed_rounds - 1), PREFETCH_MAX_BACKOFF)
+
+def _prefetch_loop(urls, images=()):
+    """
+    Keep the source pages cached: refresh them now and again whenever one expires.
+
+    Image variants do not expire, so each is made once. While pages or images
+    cannot be fetched (e.g. on a restricted network) the rounds back off
+    exponentially instead of retrying every minute.
+    """
+    images = list(images)
+    failed_rounds = 0
+    while True:
+        refreshed = prefetch_web_content(urls)
+        variants = prefetch_images(images)
+        images = [image for image in images if variants.get(image) is None]
+
+        if all(refreshed.values()) and not images:
+            failed_rounds = 0
+            time.sleep(seconds_until_expiry(urls))
+        else:
+            failed_rounds += 1
+            time.sleep(retry_delay(failed_rounds))
+
+@st.cache_resource(show_spinner=False)
+def start_prefetcher():
+    """
+    Start the background prefetcher once per server process.
+
+    It fetches all known education and quality-factor sources concurrently at
+    startup and refreshes them when they expire, so page requests are served
+    from the cache instead of waiting on a chain of network round trips. The
+    page images are resized into the local image cache at the same time.
+    """
+    thread = threading.Thread(target=_prefetch_loop, args=(get_prefetch_urls(), tuple(QUALITY_FACTOR_IMAGES.values())), name='content-prefetch', daemon=True)
+    thread.start()
+    return thread
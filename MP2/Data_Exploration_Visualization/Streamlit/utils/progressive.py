@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+import streamlit as st
+from utils.http_client import max_fetch_seconds
+
+# Threads running the network-backed work of page sections
+SECTION_WORKERS = 8
+
+# Extra seconds allowed for waiting on a free worker or host slot and for parsing
+SECTION_TIMEOUT_MARGIN = 15
+
+# Seconds a page waits for its deferred sections before showing a timeout message.
+# Longer than a fetch can take with all its retries, so a section is only reported
+# as timed out once its fetch has given up or is stuck
+SECTION_TIMEOUT = max_fetch_seconds() + SECTION_TIMEOUT_MARGIN
+
+@st.cache_resource(show_spinner=False)
+def get_section_executor():
+    """Return the executor shared by all sessions for deferred page sections"""
+    return ThreadPoolExecutor(max_workers=SECTION_WORKERS, thread_name_prefix='page-section')
+
+class ProgressiveSections:
+    """
+    Network-backed blocks of a page, rendered after the local content.
+
+    defer() reserves a placeholder where the block belongs and starts its
+    fetch/extract/summarize work in the background. render(), called at the
+    end of the script, fills each placeholder as soon as its work finishes,
+    so the rest of the page never waits on the network.
+    """
+
+    def __init__(self, executor=None):
+        self._executor = executor or get_section_executor()
+        self._pending = []
+
+    def defer(self, work, render, message="Loading..."):
+        """
+        Run work() in the background and later call render(result) in a placeholder
+        created at the current position on the page.
+
+        work must not call Streamlit display functions; render does the drawing.
+        """
+        placeholder = st.empty()
+        placeholder.caption(f"⏳ {message}")
+        self._pending.append((self._executor.submit(work), placeholder, render))
+
+    def render(self, timeout=SECTION_TIMEOUT):
+        """
+        Fill the placeholders in the order their work completes.
+
+        Work still running after timeout is not cancelled: its result is
+        ignored here but still fills the caches, so a reload shows it.
+        """
+        pending = {future: (placeholder, render) for future, placeholder, render in self._pending}
+        self._pending = []
+
+        try:
+            for future in as_completed(pending, timeout=timeout):
+                placeholder, render = pending.pop(future)
+                with placeholder.container():
+                    try:
+                        render(future.result())
+                    except Exception as e:
+                        st.error(f"Error loading this section: {str(e)}")
+        except TimeoutError:
+            for placeholder, _ in pending.values():
+                placeholder.warning("This section is taking too long to load. Reload the page to try again.")
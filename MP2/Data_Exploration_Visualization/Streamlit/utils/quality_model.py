@@ -0,0 +1,125 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.data_processing import dataframe_fingerprint
+from utils.similarity_search import get_similarity_features
+from utils.disk_cache import cache_path, load_pickle, save_pickle
+from utils.worker_pool import run_in_pool, worker_threads
+from utils.lazy_imports import lazy_import
+
+# scikit-learn is imported on first use
+linear_model = lazy_import('sklearn.linear_model')
+ensemble = lazy_import('sklearn.ensemble')
+pipeline = lazy_import('sklearn.pipeline')
+preprocessing = lazy_import('sklearn.preprocessing')
+model_selection = lazy_import('sklearn.model_selection')
+
+# Bump when features or estimators change so stale artifacts on disk are ignored
+ARTIFACT_VERSION = 1
+
+# Number of cross-validation folds
+CV_FOLDS = 5
+
+# Available models and their display names
+QUALITY_MODELS = {
+    'ridge': 'Ridge regression',
+    'gradient_boosting': 'Gradient boosting'
+}
+
+# A trained model together with what is needed to use and describe it
+QualityModel = namedtuple('QualityModel', [
+    'name',
+    'feature_cols',
+    'estimator',
+    'cv_scores',
+    'fingerprint'
+])
+
+def build_design_matrix(df, feature_cols):
+    """
+    Return the model inputs: chemical features plus a red-wine indicator
+    """
+    X = df[[col for col in feature_cols if col != 'is_red']].to_numpy(dtype=float)
+    is_red = (df['wine_type'] == 'red').to_numpy(dtype=float)
+    return np.column_stack([X, is_red])
+
+def make_estimator(name):
+    """
+    Create an unfitted estimator for a model name
+    """
+    if name == 'ridge':
+        return pipeline.make_pipeline(
+            preprocessing.StandardScaler(),
+            linear_model.RidgeCV(alphas=np.logspace(-3, 3, 13))
+        )
+    if name == 'gradient_boosting':
+        return ensemble.HistGradientBoostingRegressor(
+            max_iter=300,
+            learning_rate=0.05,
+            l2_regularization=1.0,
+            random_state=0
+        )
+    raise ValueError(f"Unknown model '{name}'. Choose from {list(QUALITY_MODELS)}")
+
+def _score_fold(name, X, y, train_idx, test_idx):
+    """
+    Fit on one training fold and score on its test fold (runs in a worker process)
+    """
+    with worker_threads():
+        estimator = make_estimator(name).fit(X[train_idx], y[train_idx])
+        errors = estimator.predict(X[test_idx]) - y[test_idx]
+
+    return {
+        'rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'mae': float(np.mean(np.abs(errors))),
+        'r2': float(1 - np.sum(errors ** 2) / np.sum((y[test_idx] - y[test_idx].mean()) ** 2))
+    }
+
+def train_quality_model(df, name, parallel=True):
+    """
+    Cross-validate a model with folds run in parallel, then fit it on all rows
+    """
+    feature_cols = get_similarity_features(df) + ('is_red',)
+    X = build_design_matrix(df, feature_cols)
+    y = df['quality'].to_numpy(dtype=float)
+
+    folds = model_selection.KFold(n_splits=CV_FOLDS, shuffle=True, random_state=0).split(X)
+    fold_scores = run_in_pool(
+        _score_fold,
+        [(name, X, y, train_idx, test_idx) for train_idx, test_idx in folds],
+        parallel=parallel
+    )
+    cv_scores = pd.DataFrame(fold_scores).mean().to_dict()
+
+    estimator = make_estimator(name).fit(X, y)
+    return QualityModel(name, feature_cols, estimator, cv_scores, dataframe_fingerprint(df))
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _load_quality_model(fingerprint, name, _df):
+    """
+    Load a model artifact from disk, training and persisting it only if missing
+    """
+    path = cache_path('quality_models', f"v{ARTIFACT_VERSION}-{fingerprint}-{name}")
+    model = load_pickle(path)
+    if model is None:
+        model = train_quality_model(_df, name)
+        save_pickle(path, model)
+    return model
+
+def get_quality_model(df, name='gradient_boosting'):
+    """
+    Return the trained model for a dataset, loaded once per process.
+
+    Artifacts are keyed by a fingerprint of the training data, so a model is
+    only trained again when the dataset changes.
+    """
+    if name not in QUALITY_MODELS:
+        raise ValueError(f"Unknown model '{name}'. Choose from {list(QUALITY_MODELS)}")
+    return _load_quality_model(dataframe_fingerprint(df), name, df)
+
+def predict_quality(model, df):
+    """
+    Predict quality for every row of df in one vectorized call
+    """
+    return model.estimator.predict(build_design_matrix(df, model.feature_cols))
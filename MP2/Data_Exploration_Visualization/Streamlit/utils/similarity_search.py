@@ -0,0 +1,169 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.data_processing import dataframe_fingerprint, get_feature_descriptions
+from utils.disk_cache import cache_path, load_pickle, save_pickle
+from utils.lazy_imports import lazy_import
+
+# SciPy is imported on first use
+spatial = lazy_import('scipy.spatial')
+
+# Bump when the index layout changes so stale files on disk are ignored
+INDEX_VERSION = 2
+
+# A standardized KD-tree over one dataset version and wine type
+SimilarityIndex = namedtuple('SimilarityIndex', [
+    'feature_cols',
+    'mean',
+    'scale',
+    'tree',
+    'row_labels',
+    'wine_type'
+])
+
+def get_similarity_features(df):
+    """
+    Return the chemical features used to compare wines (quality and wine type excluded)
+    """
+    numeric_cols = set(df.select_dtypes(include=[np.number]).columns)
+    return tuple(
+        col for col in get_feature_descriptions()
+        if col in numeric_cols and col not in ('quality', 'wine_type')
+    )
+
+def _build_index(df, feature_cols, wine_type):
+    """Standardize the features and build a KD-tree over them"""
+    X = df[list(feature_cols)].to_numpy(dtype=float)
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+
+    tree = spatial.cKDTree((X - mean) / scale)
+    return SimilarityIndex(feature_cols, mean, scale, tree, df.index.to_numpy(), wine_type)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _cached_index(fingerprint, feature_cols, wine_type, _df):
+    """
+    Load the index from disk, or build and persist it, once per process
+    """
+    path = cache_path('similarity', f"v{INDEX_VERSION}-{fingerprint}-{wine_type or 'all'}")
+    index = load_pickle(path)
+    if index is None:
+        index = _build_index(_df, feature_cols, wine_type)
+        save_pickle(path, index)
+    return index
+
+def get_similarity_index(df, wine_type=None):
+    """
+    Return the similarity index for a dataset version and wine type.
+
+    Build it on the full dataset, not on a filtered view: filters are applied
+    to query results (see row_mask), so there is one index per dataset
+    version and wine type. Indexes are kept in memory and on disk, keyed by a
+    fingerprint of the data and its row labels, so they are only rebuilt when
+    the data changes.
+    """
+    if wine_type:
+        df = df[df['wine_type'] == wine_type]
+    feature_cols = get_similarity_features(df)
+    fingerprint = dataframe_fingerprint(df, feature_cols, include_index=True)
+
+    return _cached_index(fingerprint, feature_cols, wine_type, df)
+
+def _standardize_profiles(index, profiles):
+    """Turn a profile dict, Series, DataFrame or array into standardized query rows"""
+    if isinstance(profiles, dict):
+        profiles = pd.DataFrame([profiles])
+    elif isinstance(profiles, pd.Series):
+        profiles = profiles.to_frame().T
+
+    if isinstance(profiles, pd.DataFrame):
+        X = profiles[list(index.feature_cols)].to_numpy(dtype=float)
+    else:
+        X = np.atleast_2d(np.asarray(profiles, dtype=float))
+
+    return (X - index.mean) / index.scale
+
+def row_mask(index, labels):
+    """
+    Boolean mask over the indexed rows that keeps only the given row labels (e.g. a filtered view)
+    """
+    return np.isin(index.row_labels, np.asarray(labels))
+
+def _tree_query(index, X, k):
+    """Query the tree for k neighbours, always returning 2D arrays"""
+    distances, positions = index.tree.query(X, k=k)
+    return np.asarray(distances).reshape(-1, k), np.asarray(positions).reshape(-1, k)
+
+def query_nearest(index, profiles, k=5, allowed=None):
+    """
+    Find the k nearest wines for one or many profiles in a single batched query.
+
+    allowed is an optional mask from row_mask; only those rows are returned.
+    The search widens until every profile has k allowed neighbours.
+    Returns (distances, row_labels), each with one row per profile.
+    """
+    X = _standardize_profiles(index, profiles)
+    if allowed is None:
+        k = min(k, index.tree.n)
+        distances, positions = _tree_query(index, X, k)
+        return distances, index.row_labels[positions]
+
+    k = min(k, int(allowed.sum()))
+    if k == 0:
+        return np.empty((len(X), 0)), np.empty((len(X), 0), dtype=index.row_labels.dtype)
+
+    fetch = k
+    while True:
+        fetch = min(fetch, index.tree.n)
+        distances, positions = _tree_query(index, X, fetch)
+        keep = allowed[positions]
+        if fetch == index.tree.n or keep.sum(axis=1).min() >= k:
+            break
+        fetch *= 4
+
+    # First k allowed neighbours of each profile, nearest first
+    order = np.argsort(~keep, axis=1, kind='stable')[:, :k]
+    distances = np.take_along_axis(distances, order, axis=1)
+    positions = np.take_along_axis(positions, order, axis=1)
+    return distances, index.row_labels[positions]
+
+def query_radius(index, profiles, radius, allowed=None):
+    """
+    Find all wines within a standardized distance of each profile.
+
+    allowed is an optional mask from row_mask. Returns one array of row
+    labels per profile.
+    """
+    neighbours = index.tree.query_ball_point(_standardize_profiles(index, profiles), r=radius)
+
+    results = []
+    for positions in neighbours:
+        positions = np.asarray(positions, dtype=int)
+        if allowed is not None:
+            positions = positions[allowed[positions]]
+        results.append(index.row_labels[positions])
+    return results
+
+def find_similar_wines(df, profile, k=5, wine_type=None, exclude_label=None, reference_df=None):
+    """
+    Return the k wines of df most similar to a profile, with their distances.
+
+    The index is built on reference_df (the full dataset; defaults to df) and
+    the results are limited to the rows of df. exclude_label drops the query
+    sample itself when searching by an existing row.
+    """
+    reference_df = reference_df if reference_df is not None else df
+    index = get_similarity_index(reference_df, wine_type)
+    allowed = row_mask(index, df.index) if reference_df is not df else None
+
+    extra = 1 if exclude_label is not None else 0
+    distances, labels = query_nearest(index, profile, k + extra, allowed)
+
+    result = df.loc[labels[0]].copy()
+    result.insert(0, 'distance', distances[0])
+    if exclude_label is not None:
+        result = result.drop(index=exclude_label, errors='ignore')
+
+    return result.head(k)
@@ -0,0 +1,176 @@
+import numpy as np
+import streamlit as st
+from utils.data_processing import dataframe_fingerprint
+from utils.lazy_imports import lazy_import
+
+# SciPy is imported on first use
+spatial = lazy_import('scipy.spatial')
+interpolate = lazy_import('scipy.interpolate')
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _build_triangulation(xy_fingerprint, _points):
+    """
+    Delaunay triangulation of the (x, y) points, built once per point set
+    """
+    return spatial.Delaunay(_points)
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _build_interpolator(xy_fingerprint, z_fingerprint, _triangulation, _values):
+    """
+    Cubic interpolator on a cached triangulation, built once per z feature
+    """
+    return interpolate.CloughTocher2DInterpolator(_triangulation, _values)
+
+def get_surface_interpolator(plot_data, x_col, y_col, z_col):
+    """
+    Return a cubic interpolator for z over (x, y), reusing the cached triangulation.
+    
+    The triangulation is keyed by the (x, y) data itself, so it is shared across
+    z features, grid resolutions and both surface plot functions for the same
+    x feature, y feature, wine type and filter.
+    """
+    xy_fingerprint = dataframe_fingerprint(plot_data, [x_col, y_col])
+    z_fingerprint = dataframe_fingerprint(plot_data, [z_col])
+    
+    points = plot_data[[x_col, y_col]].to_numpy(dtype=float)
+    triangulation = _build_triangulation(xy_fingerprint, points)
+    
+    values = plot_data[z_col].to_numpy(dtype=float)
+    return _build_interpolator(xy_fingerprint, z_fingerprint, triangulation, values)
+
+# Surface estimators selectable in create_3d_surface
+SURFACE_METHODS = {
+    'cubic': 'Cubic interpolation',
+    'binned_mean': 'Binned mean',
+    'binned_median': 'Binned median',
+    'local': 'Local weighted regression'
+}
+
+def _grid_axes(plot_data, x_col, y_col, resolution):
+    """Evenly spaced grid coordinates spanning the data range"""
+    x_unique = np.linspace(plot_data[x_col].min(), plot_data[x_col].max(), resolution)
+    y_unique = np.linspace(plot_data[y_col].min(), plot_data[y_col].max(), resolution)
+    return x_unique, y_unique
+
+def _nearest_node(values, axis_values):
+    """Index of the nearest grid node along one axis, for every value"""
+    span = axis_values[-1] - axis_values[0]
+    if span == 0:
+        return np.zeros(len(values), dtype=np.int64)
+    position = (values - axis_values[0]) / span * (len(axis_values) - 1)
+    return np.clip(np.rint(position), 0, len(axis_values) - 1).astype(np.int64)
+
+def binned_surface(x, y, z, x_unique, y_unique, statistic='mean'):
+    """
+    Mean or median of z for the samples nearest to each grid node.
+    
+    Runs in linear time for the mean (one np.bincount pass); the median adds a
+    single sort. Nodes without samples are NaN.
+    """
+    n_x, n_y = len(x_unique), len(y_unique)
+    cell = _nearest_node(y, y_unique) * n_x + _nearest_node(x, x_unique)
+    counts = np.bincount(cell, minlength=n_x * n_y)
+    
+    if statistic == 'median':
+        # Sort by cell then value; each cell's median sits in the middle of its run
+        order = np.lexsort((z, cell))
+        sorted_z = z[order]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        occupied = counts > 0
+        low = starts[occupied] + (counts[occupied] - 1) // 2
+        high = starts[occupied] + counts[occupied] // 2
+        values = np.full(n_x * n_y, np.nan)
+        values[occupied] = (sorted_z[low] + sorted_z[high]) / 2
+    else:
+        sums = np.bincount(cell, weights=z, minlength=n_x * n_y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = np.where(counts > 0, sums / counts, np.nan)
+    
+    return values.reshape(n_y, n_x)
+
+def local_regression_surface(x, y, z, x_unique, y_unique, n_neighbors=50):
+    """
+    Locally weighted linear regression of z on (x, y) at each grid node.
+    
+    Neighbours come from a cKDTree on range-scaled coordinates and are weighted
+    with a tricube kernel, and each estimate is clipped to the range of its
+    neighbours. Nodes farther than two grid cells from any sample are NaN.
+    """
+    x_grid, y_grid = np.meshgrid(x_unique, y_unique)
+    scale = np.array([np.ptp(x) or 1.0, np.ptp(y) or 1.0])
+    
+    samples = np.column_stack([x, y]) / scale
+    nodes = np.column_stack([x_grid.ravel(), y_grid.ravel()]) / scale
+    
+    k = min(n_neighbors, len(samples))
+    distances, indices = spatial.cKDTree(samples).query(nodes, k=k)
+    distances = distances.reshape(len(nodes), -1)
+    indices = indices.reshape(len(nodes), -1)
+    
+    bandwidth = distances[:, -1:] * 1.0001 + 1e-12
+    weights = (1 - (distances / bandwidth) ** 3) ** 3
+    
+    # Weighted least squares for z = b0 + b1*dx + b2*dy around every node at once
+    dx = samples[indices, 0] - nodes[:, :1]
+    dy = samples[indices, 1] - nodes[:, 1:]
+    design = np.stack([np.ones_like(dx), dx, dy], axis=2)
+    weighted = design * weights[:, :, None]
+    normal = np.einsum('nki,nkj->nij', weighted, design)
+    rhs = np.einsum('nki,nk->ni', weighted, z[indices])
+    
+    # Fall back to the weighted mean where the local fit is degenerate
+    fitted = np.sum(weights * z[indices], axis=1) / np.maximum(weights.sum(axis=1), 1e-12)
+    solvable = np.abs(np.linalg.det(normal)) > 1e-12
+    if solvable.any():
+        fitted[solvable] = np.linalg.solve(normal[solvable], rhs[solvable][:, :, None])[:, 0, 0]
+    
+    # Keep each estimate within the range of its neighbours to avoid overshoot
+    neighbour_z = z[indices]
+    fitted = np.clip(fitted, neighbour_z.min(axis=1), neighbour_z.max(axis=1))
+    
+    cell_size = np.hypot(1.0 / max(len(x_unique) - 1, 1), 1.0 / max(len(y_unique) - 1, 1))
+    fitted[distances[:, 0] > 2 * cell_size] = np.nan
+    
+    return fitted.reshape(x_grid.shape)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _estimate_surface(fingerprint, method, resolution, _x, _y, _z, _x_unique, _y_unique):
+    """
+    Cached binned or local surface estimate for one data set, method and resolution
+    """
+    if method == 'binned_median':
+        return binned_surface(_x, _y, _z, _x_unique, _y_unique, statistic='median')
+    if method == 'local':
+        return local_regression_surface(_x, _y, _z, _x_unique, _y_unique)
+    return binned_surface(_x, _y, _z, _x_unique, _y_unique, statistic='mean')
+
+def get_surface_grid(plot_data, x_col, y_col, z_col, resolution=20, method='cubic'):
+    """
+    Estimate the surface of z over (x, y) on a regular resolution x resolution grid.
+    
+    method is one of SURFACE_METHODS. 'cubic' is equivalent to
+    griddata(method='cubic') without rebuilding the triangulation; the binned and
+    local estimators are robust to noisy targets and scale to large data sets.
+    """
+    if method not in SURFACE_METHODS:
+        raise ValueError(f"Unknown surface method '{method}'. Choose from {list(SURFACE_METHODS)}")
+    
+    x_unique, y_unique = _grid_axes(plot_data, x_col, y_col, resolution)
+    x_grid, y_grid = np.meshgrid(x_unique, y_unique)
+    
+    if method == 'cubic':
+        interpolator = get_surface_interpolator(plot_data, x_col, y_col, z_col)
+        z_grid = interpolator(x_grid, y_grid)
+    else:
+        z_grid = _estimate_surface(
+            dataframe_fingerprint(plot_data, [x_col, y_col, z_col]),
+            method,
+            resolution,
+            plot_data[x_col].to_numpy(dtype=float),
+            plot_data[y_col].to_numpy(dtype=float),
+            plot_data[z_col].to_numpy(dtype=float),
+            x_unique,
+            y_unique
+        )
+    
+    return x_grid, y_grid, z_grid
@@ -1,20 +1,149 @@
+import hashlib
 import re
+import numpy as np
+import streamlit as st
+from utils.content_snapshot import snapshot_summary
+from utils.lazy_imports import lazy_import
+
+# Vectorizer and sparse matrices are imported on first use
+feature_extraction = lazy_import('sklearn.feature_extraction.text')
+sparse = lazy_import('scipy.sparse')
+
+# Patterns compiled once instead of on every call
+_WHITESPACE = re.compile(r'\s+')
+_SENTENCE_BOUNDARY = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s')
+
+# TextRank damping factor and power iteration limits
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_MAX_ITER = 100
+TEXTRANK_TOL = 1e-6
+
+def split_sentences(text):
+    """
+    Normalize whitespace and split text into sentences
+    """
+    clean_text = _WHITESPACE.sub(' ', text).strip()
+    return [sentence for sentence in _SENTENCE_BOUNDARY.split(clean_text) if sentence]
+
+def _tfidf_rows(counts):
+    """
+    TF-IDF rows (L2-normalized) for the sentences of one document.
+
+    Uses the same smoothed IDF as sklearn's TfidfVectorizer, computed over
+    this document's sentences only.
+    """
+    n = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + n) / (1 + df)) + 1
+    tfidf = counts @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ tfidf
+
+def textrank_scores(tfidf):
+    """
+    Score sentences by PageRank over their cosine-similarity graph.
+
+    The similarity graph is one sparse product of the normalized TF-IDF rows.
+    """
+    n = tfidf.shape[0]
+    similarity = (tfidf @ tfidf.T).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+
+    # Row-normalize into transition probabilities; sentences sharing no terms jump uniformly
+    out_weight = np.asarray(similarity.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    out_weight[dangling] = 1.0
+    transition = (sparse.diags(1.0 / out_weight) @ similarity).T.tocsr()
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(TEXTRANK_MAX_ITER):
+        updated = (1 - TEXTRANK_DAMPING) / n + TEXTRANK_DAMPING * (
+            transition @ scores + scores[dangling].sum() / n
+        )
+        converged = np.abs(updated - scores).sum() < TEXTRANK_TOL
+        scores = updated
+        if converged:
+            break
+    return scores
+
+def _summaries(texts, max_sentences):
+    """
+    Extractive TextRank summaries of several documents.
+
+    All sentences are tokenized in one vectorizer pass with a shared
+    vocabulary; each document is then ranked on its own rows, so a summary
+    does not depend on which other documents were in the batch.
+    """
+    documents = [split_sentences(text) for text in texts]
+    all_sentences = [sentence for sentences in documents for sentence in sentences]
+    if not all_sentences:
+        return ['' for _ in texts]
+
+    try:
+        counts = feature_extraction.CountVectorizer(stop_words='english').fit_transform(all_sentences).tocsr()
+    except ValueError:
+        # Only stop words: nothing to rank on
+        counts = None
+
+    summaries = []
+    start = 0
+    for sentences in documents:
+        end = start + len(sentences)
+        if len(sentences) <= max_sentences or counts is None:
+            chosen = range(min(len(sentences), max_sentences))
+        else:
+            scores = textrank_scores(_tfidf_rows(counts[start:end]))
+            # Highest-ranked sentences (earlier ones win ties), shown in document order
+            chosen = sorted(np.argsort(-scores, kind='stable')[:max_sentences])
+        summaries.append(' '.join(sentences[i] for i in chosen))
+        start = end
+    return summaries
+
+def _text_hash(text):
+    """Hash of a document, used as its cache key"""
+    return hashlib.sha1(text.encode('utf-8', errors='replace')).hexdigest()
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_summaries(text_hashes, max_sentences, _texts):
+    """Summaries of documents, cached by their hashes and the summary length"""
+    return _summaries(_texts, max_sentences)
 
 def summarize_text(text, max_sentences=5):
     """
-    Simple text summarization - extracts the first few sentences
+    Extractive summary: the max_sentences most central sentences, in their original order.
+
+    Sentences are ranked with TextRank over TF-IDF similarity; summaries are
+    cached by document hash and length.
     """
     if not text:
         return "No text to summarize."
-    
-    # Clean the text
-    clean_text = re.sub(r'\s+', ' ', text).strip()
-    
-    # Split into sentences - simple approach
-    sentences = re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s', clean_text)
-    
-    # Select first few sentences (simple extractive summarization)
-    summary_sentences = sentences[:max_sentences]
-    summary = ' '.join(summary_sentences)
-    
-    return summary
\ No newline at end of file
+
+    # Summaries built into the offline content bundle
+    bundled = snapshot_summary(text, max_sentences)
+    if bundled is not None:
+        return bundled
+
+    return _cached_summaries((_text_hash(text),), max_sentences, (text,))[0]
+
+def summarize_texts(texts, max_sentences=5):
+    """
+    Summarize many documents at once; returns the summaries in the same order.
+
+    Bundled summaries are reused and the rest are computed in one batch.
+    """
+    summaries = [None if text else "No text to summarize." for text in texts]
+    missing = []
+    for i, text in enumerate(texts):
+        if text:
+            summaries[i] = snapshot_summary(text, max_sentences)
+            if summaries[i] is None:
+                missing.append(i)
+
+    if missing:
+        batch = tuple(texts[i] for i in missing)
+        computed = _cached_summaries(tuple(_text_hash(text) for text in batch), max_sentences, batch)
+        for i, summary in zip(missing, computed):
+            summaries[i] = summary
+    return summaries
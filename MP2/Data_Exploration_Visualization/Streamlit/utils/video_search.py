@@ -0,0 +1,128 @@
+import hashlib
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from utils.content_snapshot import snapshot_videos
+from utils.disk_cache import cache_path, save_pickle, load_pickle
+from utils.web_scraper import _fetch_web_content, single_flight
+
+# Seconds resolved video links are reused before the search is run again
+VIDEO_CACHE_TTL = 24 * 3600
+
+# Seconds a failed or empty search is remembered, so reruns do not repeat it
+VIDEO_FAILURE_TTL = 300
+
+# Searches resolved at the same time by the background resolver
+VIDEO_RESOLVER_WORKERS = 4
+
+# Bump when the entry format changes so stale files on disk are ignored
+VIDEO_CACHE_VERSION = 1
+
+# YouTube video ids are 11 characters of letters, digits, '-' and '_'
+_VIDEO_ID = re.compile(r"watch\?v=([\w-]{11})")
+
+# Result of one search: the video URLs found (empty if the search failed)
+VideoLookup = namedtuple('VideoLookup', ['query', 'video_urls', 'max_results', 'failed', 'resolved_at'])
+
+def _search_url(query):
+    """Return the YouTube results page URL for a query"""
+    return f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
+
+def _entry_path(query):
+    """Return the cache file for a query"""
+    key = hashlib.sha1(query.encode('utf-8')).hexdigest()
+    return cache_path('videos', f"v{VIDEO_CACHE_VERSION}-{key}")
+
+def parse_video_ids(html_content, max_results=5):
+    """
+    Return up to max_results unique YouTube video URLs found in a results page.
+
+    Scanning stops as soon as max_results distinct ids have been seen.
+    """
+    seen = set()
+    video_ids = []
+    for match in _VIDEO_ID.finditer(html_content):
+        video_id = match.group(1)
+        if video_id in seen:
+            continue
+        seen.add(video_id)
+        video_ids.append(video_id)
+        if len(video_ids) >= max_results:
+            break
+
+    return [f"https://www.youtube.com/watch?v={vid}" for vid in video_ids]
+
+def _cached_lookup(query, max_results):
+    """Return a still valid cached VideoLookup for the query, or None"""
+    entry = load_pickle(_entry_path(query))
+    if not isinstance(entry, VideoLookup) or entry.query != query:
+        return None
+
+    ttl = VIDEO_FAILURE_TTL if entry.failed else VIDEO_CACHE_TTL
+    if time.time() - entry.resolved_at >= ttl:
+        return None
+    if not entry.failed and entry.max_results < max_results and len(entry.video_urls) == entry.max_results:
+        # Cached for fewer results than asked for, and there may be more
+        return None
+    return entry
+
+def _resolve(query, max_results):
+    """Run the search and store the outcome, including failures"""
+    response = _fetch_web_content(_search_url(query), report_errors=False)
+    video_urls = parse_video_ids(response.text, max_results) if response is not None else []
+
+    entry = VideoLookup(query, video_urls, max_results, not video_urls, time.time())
+    save_pickle(_entry_path(query), entry)
+    return entry
+
+def resolve_videos(query, max_results=5):
+    """
+    Return up to max_results video URLs for a query, searching only when needed.
+
+    Results are kept on disk for VIDEO_CACHE_TTL; failed or empty searches for
+    VIDEO_FAILURE_TTL. Concurrent lookups of the same query share one search.
+    """
+    bundled = snapshot_videos(query)
+    if bundled is not None:
+        return bundled[:max_results]
+
+    entry = _cached_lookup(query, max_results)
+    if entry is None:
+        entry = single_flight(('videos', query), lambda: _cached_lookup(query, max_results) or _resolve(query, max_results))
+    return entry.video_urls[:max_results]
+
+def resolve_videos_batch(queries, max_results=5, max_workers=VIDEO_RESOLVER_WORKERS):
+    """
+    Resolve several queries concurrently; returns a dict of query to video URLs
+    """
+    queries = list(dict.fromkeys(queries))
+    if not queries:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as executor:
+        return dict(zip(queries, executor.map(lambda query: resolve_videos(query, max_results), queries)))
+
+def search_youtube_videos(query, max_results=5):
+    """
+    Simple function to get YouTube video links based on a search query.
+    Note: This doesn't use the YouTube API, just a basic search scrape.
+    For a production application, consider using the YouTube API.
+    """
+    return resolve_videos(query, max_results)
+
+@st.cache_resource(show_spinner=False)
+def start_video_resolver(queries, max_results=5):
+    """
+    Resolve a fixed list of queries in the background once per server process,
+    so switching between topics finds the links already cached.
+    """
+    thread = threading.Thread(
+        target=resolve_videos_batch,
+        args=(list(queries), max_results),
+        name='video-resolver',
+        daemon=True
+    )
+    thread.start()
+    return thread
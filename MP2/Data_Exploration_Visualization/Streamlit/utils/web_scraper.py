@@ -1,113 +1,155 @@
-import requests
-from bs4 import BeautifulSoup
-import re
 import time
 import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 import streamlit as st
+from utils.http_client import http_get
+from utils.html_extraction import get_section_index
+from utils.content_snapshot import snapshot_page
+from utils.http_cache import HTTP_CACHE_MAX_AGE, HTTP_CACHE_MAX_STALE, load_response, response_text, is_fresh, store_response, mark_revalidated, conditional_headers
 
-def fetch_web_content(url, cache=True):
+# Threads refreshing expired pages in the background while the stale copy is served
+REFRESH_WORKERS = 4
+
+# Fetches currently running, by URL, so concurrent callers can share them
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+_refresh_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='content-refresh')
+
+def fetch_web_content(url, cache=True, report_errors=True):
     """
     Fetch content from a web URL with caching to avoid repeated requests.
+
+    Responses are stored compressed on disk, shared by all server processes and
+    kept across restarts. Once older than HTTP_CACHE_MAX_AGE they are
+    revalidated with a conditional GET, so an unchanged page costs no body transfer.
+    Pages in the offline content bundle are served from it first.
+
+    Concurrent requests for the same URL share one fetch, and a recently
+    expired page is served at once while a single background refresh runs.
+    Pass report_errors=False when calling from a background thread.
+    """
+    page = snapshot_page(url)
+    if page is not None:
+        return page['html']
+
+    if not cache:
+        response = _fetch_web_content(url, report_errors=report_errors)
+        return response.text if response is not None else None
+
+    entry = load_response(url)
+    if entry is not None:
+        if is_fresh(entry):
+            return response_text(entry)
+        if is_fresh(entry, HTTP_CACHE_MAX_AGE + HTTP_CACHE_MAX_STALE):
+            _refresh_in_background(url, entry)
+            return response_text(entry)
+    return refresh_web_content(url, entry, report_errors)
+
+def _claim(key):
+    """
+    Register a fetch of key as running; returns (future, leader).
+
+    Only the leader runs the fetch, and must finish it with _run_claimed.
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = _in_flight[key] = Future()
+    return future, leader
+
+def _run_claimed(key, future, fetch):
+    """Run the fetch a leader claimed and share its result with the waiting callers"""
+    try:
+        result = fetch()
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+
+def single_flight(key, fetch):
+    """
+    Call fetch() unless a fetch with the same key (usually the URL) is already
+    running, in which case wait for that one and return its result instead.
+    """
+    future, leader = _claim(key)
+    if not leader:
+        return future.result()
+    return _run_claimed(key, future, fetch)
+
+def _refresh_in_background(url, entry):
+    """
+    Start refreshing an expired page unless a fetch of it is already running.
+
+    The URL is claimed before the refresh is queued, so concurrent reruns
+    never queue a second refresh of the same page.
     """
-    # Use Streamlit's caching mechanism if enabled
-    if cache:
-        return _cached_fetch_web_content(url)
-    else:
-        return _fetch_web_content(url)
-
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def _cached_fetch_web_content(url):
-    """Cached version of the web content fetcher"""
-    return _fetch_web_content(url)
-
-def _fetch_web_content(url):
+    future, leader = _claim(url)
+    if not leader:
+        return
+    try:
+        _refresh_executor.submit(_run_claimed, url, future, lambda: _refresh_web_content(url, entry, False))
+    except RuntimeError as e:
+        # Executor shut down: release the claim so waiting callers do not hang
+        future.set_exception(e)
+        with _in_flight_lock:
+            _in_flight.pop(url, None)
+
+def refresh_web_content(url, entry=None, report_errors=True):
+    """
+    Fetch a URL, or confirm its cached copy (entry) is unchanged, and update the disk cache.
+
+    Concurrent calls for the same URL are coalesced into one request.
+    """
+    return single_flight(url, lambda: _refresh_web_content(url, entry, report_errors))
+
+def _refresh_web_content(url, entry, report_errors):
+    """Perform one refresh of a URL and store the result"""
+    response = _fetch_web_content(url, conditional_headers(entry), report_errors)
+    if response is None:
+        # Serve the expired copy rather than nothing if the site is unreachable
+        return response_text(entry) if entry is not None else None
+
+    if response.status_code == 304 and entry is not None:
+        mark_revalidated(entry)
+        return response_text(entry)
+
+    store_response(
+        url,
+        response.text,
+        response.encoding,
+        response.headers.get('ETag'),
+        response.headers.get('Last-Modified')
+    )
+    return response.text
+
+def _fetch_web_content(url, extra_headers=None, report_errors=True):
     """Actual implementation of the web content fetcher"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Cache-Control': 'max-age=0'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.text
+        # Shared session: pooled connections, retries with backoff and per-host limits
+        return http_get(url, headers=extra_headers)
     except Exception as e:
-        st.error(f"Error fetching content from {url}: {str(e)}")
+        if report_errors:
+            st.error(f"Error fetching content from {url}: {str(e)}")
         return None
 
-def extract_wikipedia_section(html_content, section_id=None):
+def extract_wikipedia_section(html_content, section_id=None, url=None):
     """
     Extract specific section from Wikipedia article.
     If section_id is None, extract the introduction.
+
+    The article is parsed once into a cached section index, so looking up
+    further sections of the same page does not parse it again.
     """
     if not html_content:
         return None
     
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
+    index = get_section_index(html_content, url)
     if section_id:
-        # Find the section heading
-        section_heading = soup.find(id=section_id)
-        if not section_heading:
-            return None
-        
-        # Get the parent element (usually a heading tag like h2, h3, etc.)
-        parent = section_heading.parent
-        
-        # Extract all paragraphs until the next heading of same or higher level
-        section_text = ""
-        current = parent.find_next_sibling()
-        while current and not (current.name and current.name[0] == 'h' and int(current.name[1]) <= int(parent.name[1])):
-            if current.name == 'p':
-                section_text += current.text + " "
-            current = current.find_next_sibling()
-        
-        return section_text
-    else:
-        # Extract the introduction (paragraphs before the first heading)
-        intro_text = ""
-        first_heading = soup.find(['h1', 'h2'])
-        
-        if first_heading:
-            current = soup.find('p')
-            while current and current != first_heading:
-                if current.name == 'p':
-                    intro_text += current.text + " "
-                current = current.find_next_sibling()
-        else:
-            # If no headings found, just get the first few paragraphs
-            paragraphs = soup.find_all('p', limit=3)
-            for p in paragraphs:
-                intro_text += p.text + " "
-        
-        return intro_text
-
-def search_youtube_videos(query, max_results=5):
-    """
-    Simple function to get YouTube video links based on a search query.
-    Note: This doesn't use the YouTube API, just a basic search scrape.
-    For a production application, consider using the YouTube API.
-    """
-    search_url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
-    
-    html_content = fetch_web_content(search_url, cache=True)
-    if not html_content:
-        return []
-    
-    # Extract video IDs from the search results
-    video_ids = re.findall(r"watch\?v=(\S{11})", html_content)
-    
-    # Remove duplicates while preserving order
-    unique_ids = []
-    for video_id in video_ids:
-        if video_id not in unique_ids:
-            unique_ids.append(video_id)
-    
-    # Create video URLs
-    video_urls = [f"https://www.youtube.com/watch?v={vid}" for vid in unique_ids[:max_results]]
-    
-    return video_urls
\ No newline at end of file
+        return index.sections.get(section_id)
+    return index.intro
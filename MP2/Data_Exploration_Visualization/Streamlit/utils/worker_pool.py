@@ -0,0 +1,107 @@
+import atexit
+import sys
+import threading
+import types
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.lazy_imports import lazy_import
+
+# Thread pool limits of native libraries are imported on first use
+threadpoolctl = lazy_import('threadpoolctl')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Held while workers may be spawned, so only one thread swaps __main__ at a time
+_spawn_lock = threading.Lock()
+
+# Number of times run_in_pool had to run its calls one by one
+_serial_fallbacks = 0
+
+def get_process_pool(max_workers=None):
+    """
+    Return the shared process pool, creating it on first use
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned workers start clean instead of inheriting server threads and pyplot state
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+def shutdown_process_pool():
+    """Shut down the shared process pool"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+atexit.register(shutdown_process_pool)
+
+def _spawn_without_main(submit):
+    """
+    Call submit() with the running script hidden from any worker it spawns.
+
+    Streamlit installs the page being run as __main__, and spawn makes every
+    new worker import __main__ again: each worker would re-run the whole page
+    and crash when the page starts pools of its own. Workers only need
+    importable module-level functions, so they get an empty __main__ instead.
+    """
+    with _spawn_lock:
+        main = sys.modules.get('__main__')
+        placeholder = types.ModuleType('__main__')
+        sys.modules['__main__'] = placeholder
+        try:
+            return submit()
+        finally:
+            # Leave a __main__ installed meanwhile by another script run alone
+            if sys.modules.get('__main__') is placeholder:
+                sys.modules['__main__'] = main
+
+def submit_to_pool(function, *args):
+    """
+    Submit function(*args) to the shared process pool and return its future
+    """
+    executor = get_process_pool()
+    return _spawn_without_main(lambda: executor.submit(function, *args))
+
+def worker_threads():
+    """
+    Context manager limiting OpenMP/BLAS to one thread inside a pool worker.
+
+    Pool jobs are already parallel across processes; without the limit every
+    worker would also start a thread per core. Outside a worker nothing changes.
+    """
+    in_worker = multiprocessing.parent_process() is not None
+    return threadpoolctl.threadpool_limits(limits=1 if in_worker else None)
+
+def serial_fallbacks():
+    """Return how many times run_in_pool fell back to running calls one by one"""
+    return _serial_fallbacks
+
+def run_in_pool(function, arguments, parallel=True, max_workers=None):
+    """
+    Call function(*args) for every tuple in arguments and return results in order.
+
+    Calls run in the shared process pool; function must be an importable
+    module-level function. If the pool is unavailable, calls run one by one
+    and the fallback is counted in serial_fallbacks().
+    """
+    global _serial_fallbacks
+    arguments = list(arguments)
+
+    if parallel and len(arguments) > 1:
+        try:
+            get_process_pool(max_workers)
+            futures = [submit_to_pool(function, *args) for args in arguments]
+            return [future.result() for future in futures]
+        except (BrokenProcessPool, OSError):
+            shutdown_process_pool()
+            _serial_fallbacks += 1
+
+    return [function(*args) for args in arguments]
@@ -1,23 +1,37 @@
-from visualizations.basic_viz import (
-    plot_wine_distribution,
-    plot_feature_histogram,
-    plot_quality_distribution,
-    plot_correlation_matrix,
-    plot_boxplots,
-    plot_ph_bin_distribution
-)
+from utils.lazy_imports import lazy_exports
 
-from visualizations.feature_viz import (
-    plot_feature_comparison,
-    plot_feature_violin,
-    plot_feature_vs_quality,
-    plot_scatter_matrix,
-    plot_feature_pair
-)
+# Public functions and the submodule that defines each one. Submodules (and the
+# plotting libraries they use) are only imported when a name is first accessed.
+_EXPORTS = {
+    'plot_wine_distribution': 'visualizations.basic_viz',
+    'plot_feature_histogram': 'visualizations.basic_viz',
+    'plot_quality_distribution': 'visualizations.basic_viz',
+    'plot_correlation_matrix': 'visualizations.basic_viz',
+    'plot_boxplots': 'visualizations.basic_viz',
+    'plot_ph_bin_distribution': 'visualizations.basic_viz',
 
-from visualizations.advanced_viz import (
-    create_3d_scatter,
-    create_3d_surface,
-    create_3d_surface_with_points,
-    create_pca_visualization
-)
\ No newline at end of file
+    'plot_feature_comparison': 'visualizations.feature_viz',
+    'plot_feature_violin': 'visualizations.feature_viz',
+    'plot_feature_vs_quality': 'visualizations.feature_viz',
+    'plot_scatter_matrix': 'visualizations.feature_viz',
+    'plot_feature_pair': 'visualizations.feature_viz',
+
+    'create_3d_scatter': 'visualizations.advanced_viz',
+    'create_3d_voxel_scatter': 'visualizations.advanced_viz',
+    'create_3d_surface': 'visualizations.advanced_viz',
+    'create_3d_surface_with_points': 'visualizations.advanced_viz',
+    'create_pca_visualization': 'visualizations.advanced_viz',
+    'create_scree_plot': 'visualizations.advanced_viz',
+    'get_component_loadings': 'visualizations.advanced_viz',
+    'create_embedding_scatter': 'visualizations.advanced_viz',
+
+    'encode_typed_array': 'visualizations.plotly_output',
+    'slim_figure': 'visualizations.plotly_output',
+    'consolidate_traces': 'visualizations.plotly_output',
+    'cached_figure': 'visualizations.plotly_output',
+    'show_cached_figure': 'visualizations.plotly_output'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
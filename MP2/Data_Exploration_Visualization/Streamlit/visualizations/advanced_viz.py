@@ -1,20 +1,27 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from scipy.interpolate import griddata
+from utils.surface_interpolation import get_surface_grid
+from utils.pca_service import get_pca_features, get_pca_model, project_pca
+from visualizations.plotly_output import slim_figure, consolidate_traces
+from utils.lazy_imports import lazy_import
 
-def create_3d_scatter(df, x_col, y_col, z_col):
+# Plotly is imported on first use
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+
+def create_3d_scatter(df, x_col, y_col, z_col, color='wine_type'):
     """
-    Create an interactive 3D scatter plot using Plotly
+    Create an interactive 3D scatter plot using Plotly.
+    
+    color is the column used to color points, e.g. 'wine_type' or 'cluster'.
     """
     fig = px.scatter_3d(
         df,
         x=x_col,
         y=y_col,
         z=z_col,
-        color='wine_type',
+        color=color,
         color_discrete_map={'red': 'darkred', 'white': 'gold'},
         opacity=0.7,
         title=f'3D Relationship: {x_col} vs {y_col} vs {z_col}'
@@ -30,11 +37,14 @@ def create_3d_scatter(df, x_col, y_col, z_col):
         margin=dict(l=0, r=0, b=0, t=30)
     )
     
-    return fig
+    return slim_figure(fig)
 
-def create_3d_surface(df, x_col, y_col, z_col, wine_type=None):
+def create_3d_surface(df, x_col, y_col, z_col, wine_type=None, method='cubic', resolution=20):
     """
-    Create a 3D surface plot to visualize the interaction effect
+    Create a 3D surface plot to visualize the interaction effect.
+    
+    method selects the surface estimator (see SURFACE_METHODS) and resolution
+    the number of grid points along each axis.
     """
     # Filter data by wine type if specified
     if wine_type and wine_type != "both":
@@ -47,17 +57,9 @@ def create_3d_surface(df, x_col, y_col, z_col, wine_type=None):
         return None
     
     try:
-        # Create a grid for the surface plot
-        x_unique = np.linspace(plot_data[x_col].min(), plot_data[x_col].max(), 20)
-        y_unique = np.linspace(plot_data[y_col].min(), plot_data[y_col].max(), 20)
-        x_grid, y_grid = np.meshgrid(x_unique, y_unique)
-        
-        # Fit a simple interpolation
-        z_grid = griddata(
-            (plot_data[x_col], plot_data[y_col]),
-            plot_data[z_col],
-            (x_grid, y_grid),
-            method='cubic'
+        # Estimate the surface on a grid (cubic reuses the cached triangulation)
+        x_grid, y_grid, z_grid = get_surface_grid(
+            plot_data, x_col, y_col, z_col, resolution=resolution, method=method
         )
         
         # Create the 3D surface plot
@@ -86,7 +88,7 @@ def create_3d_surface(df, x_col, y_col, z_col, wine_type=None):
         st.error(f"Error creating surface plot: {e}")
         return None
 
-def create_3d_surface_with_points(df, x_col, y_col, z_col, wine_type=None):
+def create_3d_surface_with_points(df, x_col, y_col, z_col, wine_type=None, method='cubic', resolution=20):
     """
     Create a 3D surface plot with scatter points
     """
@@ -101,17 +103,9 @@ def create_3d_surface_with_points(df, x_col, y_col, z_col, wine_type=None):
         return None
     
     try:
-        # Create a grid for the surface plot
-        x_unique = np.linspace(plot_data[x_col].min(), plot_data[x_col].max(), 20)
-        y_unique = np.linspace(plot_data[y_col].min(), plot_data[y_col].max(), 20)
-        x_grid, y_grid = np.meshgrid(x_unique, y_unique)
-        
-        # Fit a simple interpolation
-        z_grid = griddata(
-            (plot_data[x_col], plot_data[y_col]),
-            plot_data[z_col],
-            (x_grid, y_grid),
-            method='cubic'
+        # Estimate the surface on a grid (cubic reuses the cached triangulation)
+        x_grid, y_grid, z_grid = get_surface_grid(
+            plot_data, x_col, y_col, z_col, resolution=resolution, method=method
         )
         
         # Create the 3D surface plot with points
@@ -157,52 +151,52 @@ def create_3d_surface_with_points(df, x_col, y_col, z_col, wine_type=None):
             margin=dict(l=0, r=0, b=0, t=30)
         )
         
-        return fig
+        return slim_figure(fig)
     
     except Exception as e:
         st.error(f"Error creating surface plot with points: {e}")
         return None
 
-def create_pca_visualization(df, n_components=3):
+def create_pca_visualization(df, n_components=3, axes=(0, 1, 2), color='wine_type'):
     """
-    Create a 3D visualization of PCA-transformed data
+    Create a 3D visualization of PCA-transformed data.
+    
+    axes selects which three components (0-based) are plotted; all of them come
+    from the same cached decomposition. color is the column used to color points.
     """
-    from sklearn.preprocessing import StandardScaler
-    from sklearn.decomposition import PCA
+    axes = list(axes)
+    n_components = max(n_components, max(axes) + 1)
+    labels = [f'PC{axis + 1}' for axis in axes]
     
-    # Select only numeric columns
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    numeric_cols = [col for col in numeric_cols if col != 'quality']  # Exclude quality
+    # Select only numeric columns, excluding quality
+    numeric_cols = list(get_pca_features(df))
     
     if len(numeric_cols) < 3:
         st.warning("Not enough numeric features for PCA visualization.")
         return None
     
     try:
-        # Standardize the data
-        X = df[numeric_cols].values
-        X_std = StandardScaler().fit_transform(X)
-        
-        # Apply PCA
-        pca = PCA(n_components=n_components)
-        X_pca = pca.fit_transform(X_std)
+        # Fitted scaler and components are cached per data fingerprint and feature set
+        pca = get_pca_model(df, numeric_cols, n_components)
+        X_pca = project_pca(pca, df)[:, axes]
         
         # Create a DataFrame with PCA results
         pca_df = pd.DataFrame(
             data=X_pca,
-            columns=[f'PC{i+1}' for i in range(n_components)]
+            columns=labels
         )
-        pca_df['wine_type'] = df['wine_type'].values
+        pca_df[color] = df[color].values
         pca_df['quality'] = df['quality'].values
         
         # Create 3D scatter plot
         fig = px.scatter_3d(
             pca_df,
-            x='PC1',
-            y='PC2',
-            z='PC3',
-            color='wine_type',
+            x=labels[0],
+            y=labels[1],
+            z=labels[2],
+            color=color,
             symbol='quality',
+            custom_data=['quality'],
             color_discrete_map={'red': 'darkred', 'white': 'gold'},
             opacity=0.7,
             title='PCA Visualization of Wine Data'
@@ -211,18 +205,242 @@ def create_pca_visualization(df, n_components=3):
         # Update layout
         fig.update_layout(
             scene=dict(
-                xaxis_title=f'PC1 ({pca.explained_variance_ratio_[0]:.2%} variance)',
-                yaxis_title=f'PC2 ({pca.explained_variance_ratio_[1]:.2%} variance)',
-                zaxis_title=f'PC3 ({pca.explained_variance_ratio_[2]:.2%} variance)'
+                xaxis_title=f'{labels[0]} ({pca.explained_variance_ratio[axes[0]]:.2%} variance)',
+                yaxis_title=f'{labels[1]} ({pca.explained_variance_ratio[axes[1]]:.2%} variance)',
+                zaxis_title=f'{labels[2]} ({pca.explained_variance_ratio[axes[2]]:.2%} variance)'
             ),
             margin=dict(l=0, r=0, b=0, t=30)
         )
         
-        # Calculate total explained variance
-        total_var = sum(pca.explained_variance_ratio_)
+        # One trace per wine type instead of one per wine type x quality
+        fig = slim_figure(consolidate_traces(
+            fig,
+            per_point=('symbol',),
+            hovertemplate=f'{color}=%{{fullData.name}}<br>quality=%{{customdata[0]}}<br>'
+                          f'{labels[0]}=%{{x}}<br>{labels[1]}=%{{y}}<br>{labels[2]}=%{{z}}<extra></extra>'
+        ))
+        
+        # Calculate total explained variance of the displayed components
+        total_var = sum(pca.explained_variance_ratio[axes])
         
-        return fig, total_var, pca.components_, numeric_cols
+        return fig, total_var, pca.components[axes], numeric_cols
     
     except Exception as e:
         st.error(f"Error creating PCA visualization: {e}")
-        return None, None, None, None
\ No newline at end of file
+        return None, None, None, None
+
+def create_scree_plot(decomposition):
+    """
+    Create a scree plot with cumulative explained variance from a cached decomposition
+    """
+    ratios = decomposition.explained_variance_ratio
+    labels = [f'PC{i+1}' for i in range(len(ratios))]
+    
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            x=labels,
+            y=ratios,
+            name='Explained variance',
+            marker_color='steelblue'
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=labels,
+            y=np.cumsum(ratios),
+            mode='lines+markers',
+            name='Cumulative variance',
+            line=dict(color='darkred')
+        )
+    )
+    
+    fig.update_layout(
+        title='Scree Plot and Cumulative Explained Variance',
+        xaxis_title='Principal Component',
+        yaxis_title='Explained Variance Ratio',
+        yaxis=dict(tickformat='.0%', range=[0, 1.05]),
+        margin=dict(l=0, r=0, b=0, t=30)
+    )
+    
+    return fig
+
+def get_component_loadings(decomposition, k):
+    """
+    Return the loadings of the first k components as a DataFrame (no refit)
+    """
+    k = min(k, len(decomposition.components))
+    return pd.DataFrame(
+        decomposition.components[:k],
+        columns=list(decomposition.feature_cols),
+        index=[f'PC{i+1}' for i in range(k)]
+    )
+
+def _voxel_aggregate(points, n_bins, sparse_threshold):
+    """
+    Bin points into an n_bins^3 grid and return voxel ids, counts and occupancy
+    """
+    mins = points.min(axis=0)
+    spans = points.max(axis=0) - mins
+    spans[spans == 0] = 1.0
+    
+    cells = np.floor((points - mins) / spans * n_bins).astype(np.int64)
+    cells = np.clip(cells, 0, n_bins - 1)
+    voxel_index = (cells[:, 0] * n_bins + cells[:, 1]) * n_bins + cells[:, 2]
+    
+    voxel_ids, inverse, counts = np.unique(voxel_index, return_inverse=True, return_counts=True)
+    dense = counts >= sparse_threshold
+    n_markers = int(dense.sum() + counts[~dense].sum())
+    
+    return inverse, counts, dense, n_markers
+
+def _choose_voxel_bins(points, budget, sparse_threshold, max_bins=64):
+    """
+    Find the finest grid whose aggregated markers fit within the point budget
+    """
+    low, high = 1, max_bins
+    best = _voxel_aggregate(points, 1, sparse_threshold) + (1,)
+    
+    # Marker count grows with resolution, so binary search the resolution
+    while low <= high:
+        mid = (low + high) // 2
+        result = _voxel_aggregate(points, mid, sparse_threshold)
+        if result[3] <= budget:
+            best = result + (mid,)
+            low = mid + 1
+        else:
+            high = mid - 1
+    
+    return best
+
+def create_3d_voxel_scatter(df, x_col, y_col, z_col, point_budget=5000, color_by='count', sparse_threshold=3):
+    """
+    Create a 3D scatter plot that aggregates dense regions into voxels.
+    
+    Each wine type is binned on its own adaptive grid. Occupied voxels become one
+    marker at the mean position of their points, sized by count and colored by
+    count or mean quality. Voxels with fewer than sparse_threshold points keep
+    their raw points. The total number of markers stays within point_budget.
+    """
+    if len(df) <= point_budget:
+        return create_3d_scatter(df, x_col, y_col, z_col)
+    
+    colorscales = {'red': 'Reds', 'white': 'YlOrBr'}
+    raw_colors = {'red': 'darkred', 'white': 'gold'}
+    
+    fig = go.Figure()
+    wine_types = df['wine_type'].unique()
+    
+    for i, wine_type in enumerate(wine_types):
+        wine_data = df[df['wine_type'] == wine_type]
+        if len(wine_data) == 0:
+            continue
+        
+        # Split the budget between wine types by sample count
+        budget = max(1, int(point_budget * len(wine_data) / len(df)))
+        points = wine_data[[x_col, y_col, z_col]].to_numpy(dtype=float)
+        
+        inverse, counts, dense, n_markers, n_bins = _choose_voxel_bins(points, budget, sparse_threshold)
+        n_voxels = len(counts)
+        
+        # Mean position and quality per voxel in one bincount pass per column
+        centers = np.column_stack([
+            np.bincount(inverse, weights=points[:, axis], minlength=n_voxels) / counts
+            for axis in range(3)
+        ])
+        if color_by == 'quality' and 'quality' in wine_data:
+            marker_values = np.bincount(
+                inverse, weights=wine_data['quality'].to_numpy(dtype=float), minlength=n_voxels
+            ) / counts
+            color_title = 'Mean quality'
+        else:
+            marker_values = counts.astype(float)
+            color_title = 'Samples'
+        
+        dense_centers = centers[dense]
+        dense_counts = counts[dense]
+        sizes = 4 + 12 * np.sqrt(dense_counts / dense_counts.max()) if len(dense_counts) else []
+        
+        fig.add_trace(
+            go.Scatter3d(
+                x=dense_centers[:, 0],
+                y=dense_centers[:, 1],
+                z=dense_centers[:, 2],
+                mode='markers',
+                marker=dict(
+                    size=sizes,
+                    color=marker_values[dense],
+                    colorscale=colorscales.get(wine_type, 'Viridis'),
+                    colorbar=dict(title=f'{wine_type} {color_title}', x=1.0 + 0.12 * i),
+                    opacity=0.8
+                ),
+                customdata=np.column_stack([dense_counts, marker_values[dense]]),
+                hovertemplate=(
+                    f'{x_col}=%{{x}}<br>{y_col}=%{{y}}<br>{z_col}=%{{z}}<br>'
+                    'samples=%{customdata[0]}<br>' + color_title.lower() + '=%{customdata[1]:.2f}'
+                ),
+                name=f'{wine_type} (voxels, {n_bins}³ grid)'
+            )
+        )
+        
+        # Keep the raw points of sparse voxels
+        sparse_points = points[~dense[inverse]]
+        if len(sparse_points):
+            fig.add_trace(
+                go.Scatter3d(
+                    x=sparse_points[:, 0],
+                    y=sparse_points[:, 1],
+                    z=sparse_points[:, 2],
+                    mode='markers',
+                    marker=dict(size=3, color=raw_colors.get(wine_type, 'gray'), opacity=0.7),
+                    name=f'{wine_type} (sparse points)'
+                )
+            )
+    
+    fig.update_layout(
+        title=f'3D Relationship (aggregated): {x_col} vs {y_col} vs {z_col}',
+        scene=dict(
+            xaxis_title=x_col,
+            yaxis_title=y_col,
+            zaxis_title=z_col
+        ),
+        margin=dict(l=0, r=0, b=0, t=30)
+    )
+    
+    return slim_figure(fig)
+
+def create_embedding_scatter(frame, color='wine_type', title='t-SNE Map of Wine Samples'):
+    """
+    Create a 2D scatter plot of a layout frame with 'x', 'y' and 'placed' columns.
+    
+    Rows placed into the layout after it was computed are drawn as crosses.
+    """
+    plot_df = frame.copy()
+    plot_df['position'] = np.where(plot_df['placed'], 'placed', 'optimized')
+    
+    fig = px.scatter(
+        plot_df,
+        x='x',
+        y='y',
+        color=color,
+        symbol='position',
+        symbol_map={'optimized': 'circle', 'placed': 'x'},
+        custom_data=['quality'],
+        color_discrete_map={'red': 'darkred', 'white': 'gold'},
+        opacity=0.6,
+        title=title
+    )
+    fig.update_traces(marker=dict(size=4))
+    fig.update_layout(
+        xaxis=dict(title='', showticklabels=False),
+        yaxis=dict(title='', showticklabels=False),
+        margin=dict(l=0, r=0, b=0, t=30),
+        height=650
+    )
+    
+    # One trace per color group instead of one per color group x position
+    return slim_figure(consolidate_traces(
+        fig,
+        per_point=('symbol',),
+        hovertemplate=f'{color}=%{{fullData.name}}<br>quality=%{{customdata[0]}}<extra></extra>'
+    ))
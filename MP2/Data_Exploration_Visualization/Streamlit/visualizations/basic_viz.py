@@ -1,8 +1,12 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
 import pandas as pd
 import numpy as np
+from utils.lazy_imports import lazy_import
+from utils.correlation import CORRELATION_METHODS, get_correlation_matrices
+
+# Plotting libraries are imported on first use
+plt = lazy_import('matplotlib.pyplot')
+sns = lazy_import('seaborn')
 
 def plot_wine_distribution(df):
     """
@@ -78,18 +82,24 @@ def plot_quality_distribution(df):
     
     return fig
 
-def plot_correlation_matrix(df, size=(10, 8)):
+def plot_correlation_matrix(df, size=(10, 8), method='pearson', alpha=None):
     """
-    Plot correlation matrix for all numeric features
+    Plot correlation matrix for all numeric features.
+
+    method is 'pearson', 'spearman' or 'kendall'. If alpha is given, cells
+    whose correlation is not significant at that level are left blank.
     """
-    # Calculate correlation matrix
-    corr_matrix = df.select_dtypes(include=[np.number]).corr()
+    # Calculate correlation matrix (cached together with its p-values)
+    matrices = get_correlation_matrices(df, methods=(method,))
+    corr_matrix = matrices[method]
+    mask = matrices[f'{method}_p'] >= alpha if alpha else None
     
     # Create heatmap
     fig, ax = plt.subplots(figsize=size)
     
     sns.heatmap(
         corr_matrix, 
+        mask=mask,
         annot=True, 
         cmap='coolwarm', 
         fmt=".2f",
@@ -99,7 +109,7 @@ def plot_correlation_matrix(df, size=(10, 8)):
         ax=ax
     )
     
-    plt.title('Feature Correlation Matrix')
+    plt.title(f'Feature Correlation Matrix ({CORRELATION_METHODS[method]})')
     
     return fig
 
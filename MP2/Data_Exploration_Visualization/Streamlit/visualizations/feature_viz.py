@@ -1,8 +1,11 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
 import pandas as pd
 import numpy as np
+from utils.lazy_imports import lazy_import
+
+# Plotting libraries are imported on first use
+plt = lazy_import('matplotlib.pyplot')
+sns = lazy_import('seaborn')
 
 def plot_feature_comparison(df, feature):
     """
@@ -0,0 +1,203 @@
+import base64
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.data_processing import dataframe_fingerprint
+from utils.lazy_imports import lazy_import
+
+# Plotly is imported on first use
+go = lazy_import('plotly.graph_objects')
+plotly_utils = lazy_import('plotly.utils')
+
+# Trace attributes that hold one value per data point
+DATA_ARRAY_ATTRS = ('x', 'y', 'z', 'customdata', 'text', 'hovertext', 'ids')
+
+# Maximum number of slimmed figures kept in memory
+FIGURE_CACHE_SIZE = 32
+
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+def encode_typed_array(values, dtype='f4'):
+    """
+    Encode numeric values as a base64 typed array understood by plotly.js
+    """
+    array = np.ascontiguousarray(np.asarray(values, dtype=dtype))
+    encoded = {
+        'dtype': np.dtype(dtype).str.lstrip('<>=|'),
+        'bdata': base64.b64encode(array.tobytes()).decode('ascii')
+    }
+    # 2D grids such as surface z values also need their shape
+    if array.ndim > 1:
+        encoded['shape'] = ', '.join(str(dim) for dim in array.shape)
+    return encoded
+
+def _is_numeric_array(values):
+    """Check whether a trace attribute holds a numeric per-point array"""
+    if values is None or isinstance(values, (str, dict)) or np.isscalar(values):
+        return False
+    array = np.asarray(values)
+    return array.ndim >= 1 and array.dtype.kind in 'biuf'
+
+def _as_point_array(values, n_points):
+    """Broadcast a scalar trace attribute into a per-point array"""
+    if values is None or isinstance(values, str) or np.isscalar(values):
+        return np.full(n_points, values, dtype=object)
+    return np.asarray(values, dtype=object)
+
+def slim_figure(fig, dtype='f4'):
+    """
+    Convert the numeric data arrays of a figure to float32 typed arrays
+    """
+    for trace in fig.data:
+        for attr in ('x', 'y', 'z', 'customdata'):
+            values = getattr(trace, attr, None)
+            if _is_numeric_array(values):
+                trace[attr] = encode_typed_array(values, dtype)
+
+        marker = getattr(trace, 'marker', None)
+        if marker is not None:
+            for attr in ('color', 'size', 'opacity'):
+                values = getattr(marker, attr, None)
+                if _is_numeric_array(values):
+                    marker[attr] = encode_typed_array(values, dtype)
+
+    return fig
+
+def _style_key(trace, per_point):
+    """Describe everything about a trace except its data and per-point attributes"""
+    style = trace.to_plotly_json()
+    for attr in DATA_ARRAY_ATTRS + ('name', 'legendgroup', 'showlegend', 'hovertemplate'):
+        style.pop(attr, None)
+
+    marker = dict(style.get('marker', {}))
+    for attr in per_point:
+        marker.pop(attr, None)
+    style['marker'] = marker
+
+    return json.dumps(style, sort_keys=True, cls=plotly_utils.PlotlyJSONEncoder)
+
+def consolidate_traces(fig, per_point=('symbol',), trace_types=('scatter3d', 'scatter'),
+                       hovertemplate=None):
+    """
+    Merge traces that share a style into single traces with per-point marker arrays.
+
+    Traces that differ only in the marker attributes listed in per_point (and in
+    their names) are combined, so e.g. one trace per wine type x quality becomes
+    one trace per wine type with a per-point symbol array. Pass a hovertemplate
+    that reads from customdata to replace the per-trace templates; otherwise the
+    original trace names are kept as per-point hover text.
+    """
+    groups = OrderedDict()
+    untouched = []
+
+    for trace in fig.data:
+        if trace.type not in trace_types or trace.x is None:
+            untouched.append(trace)
+            continue
+        groups.setdefault(_style_key(trace, per_point), []).append(trace)
+
+    merged_traces = []
+    for traces in groups.values():
+        if len(traces) == 1:
+            merged_traces.append(traces[0])
+            continue
+
+        first = traces[0]
+        merged = first.to_plotly_json()
+        counts = [len(trace.x) for trace in traces]
+
+        for attr in ('x', 'y', 'z', 'customdata'):
+            parts = [getattr(trace, attr, None) for trace in traces]
+            if all(part is not None for part in parts):
+                merged[attr] = np.concatenate([np.asarray(part) for part in parts])
+
+        merged.pop('text', None)
+        if hovertemplate:
+            merged['hovertemplate'] = hovertemplate
+        else:
+            # Keep the original trace name on hover for every point
+            merged['hovertext'] = np.concatenate([
+                _as_point_array(trace.name, count) for trace, count in zip(traces, counts)
+            ])
+            merged.pop('hovertemplate', None)
+
+        marker = dict(merged.get('marker', {}))
+        for attr in per_point:
+            values = [getattr(trace.marker, attr, None) for trace in traces]
+            if any(value is not None for value in values):
+                marker[attr] = np.concatenate([
+                    _as_point_array(value, count) for value, count in zip(values, counts)
+                ]).tolist()
+        merged['marker'] = marker
+
+        group_name = first.legendgroup or first.name or ''
+        merged['name'] = group_name.split(', ')[0]
+        merged['legendgroup'] = merged['name']
+        merged['showlegend'] = True
+
+        merged_traces.append(type(first)(merged))
+
+    fig.data = []
+    fig.add_traces(merged_traces + untouched)
+    return fig
+
+def _figure_key(key, args):
+    """Extend a figure key with a fingerprint of every DataFrame the figure is built from"""
+    return (key,) + tuple(dataframe_fingerprint(arg) for arg in args if isinstance(arg, pd.DataFrame))
+
+def _shared_figure(key, build_figure, args, kwargs):
+    """
+    Return the cached slimmed figure for key, building it on a miss.
+
+    The figure is shared by every session and must not be modified. Whatever
+    build_figure returned if it was not a Plotly figure (e.g. None on error)
+    is passed through uncached.
+    """
+    key = _figure_key(key, args)
+    with _figure_cache_lock:
+        fig = _figure_cache.get(key)
+        if fig is not None:
+            _figure_cache.move_to_end(key)
+
+    if fig is None:
+        fig = build_figure(*args, **kwargs)
+        if not isinstance(fig, go.Figure):
+            return fig
+        fig = slim_figure(fig)
+
+        with _figure_cache_lock:
+            _figure_cache[key] = fig
+            _figure_cache.move_to_end(key)
+            while len(_figure_cache) > FIGURE_CACHE_SIZE:
+                _figure_cache.popitem(last=False)
+
+    return fig
+
+def cached_figure(key, build_figure, *args, **kwargs):
+    """
+    Build and slim a figure once per key and per data, and return a copy of it.
+
+    DataFrame arguments are fingerprinted into the key, so a change of data or
+    sampling never serves a stale figure. Use this when the figure is changed
+    after building; show_cached_figure displays one without copying it.
+    """
+    fig = _shared_figure(key, build_figure, args, kwargs)
+    return go.Figure(fig) if isinstance(fig, go.Figure) else fig
+
+def show_cached_figure(key, build_figure, *args, **kwargs):
+    """
+    Display a cached figure with st.plotly_chart; returns False if none could be built.
+
+    The shared figure is passed as is (st.plotly_chart only serializes it),
+    so reruns skip both building and copying the figure.
+    """
+    fig = _shared_figure(key, build_figure, args, kwargs)
+    if not isinstance(fig, go.Figure):
+        return False
+    st.plotly_chart(fig, use_container_width=True)
+    return True
@@ -0,0 +1,37 @@
+import io
+from collections import namedtuple
+from utils.worker_pool import run_in_pool
+
+# A figure to render: a plotting function, the data it plots and its keyword parameters
+FigureJob = namedtuple('FigureJob', ['function', 'data', 'params'])
+
+# Settings used when converting figures to images (same defaults as st.pyplot: PNG at 200 dpi)
+IMAGE_FORMAT = 'png'
+IMAGE_DPI = 200
+
+def _render_job(job, fmt=IMAGE_FORMAT, dpi=IMAGE_DPI):
+    """
+    Render one figure job to image bytes with the Agg backend and close the figure
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig = job.function(job.data, **(job.params or {}))
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        # Never leave figures registered in pyplot's global state
+        plt.close(fig)
+
+def render_figures(jobs, parallel=True, max_workers=None):
+    """
+    Render a list of figure jobs and return their images in the same order.
+
+    Jobs run concurrently in a process pool, so total time approaches the slowest
+    figure instead of the sum. Plotting functions must be importable module-level
+    functions. If the pool is unavailable, the jobs are rendered one by one.
+    """
+    return run_in_pool(_render_job, [(job,) for job in jobs], parallel, max_workers)